@@ -1,13 +1,11 @@
-from rauth import OAuth1Service
-from rauth import OAuth1Session
-from rauth.oauth import HmacSha1Signature
-
+import threading
 import xml.etree.ElementTree
 
-from pychpp import (ht_user, ht_team, ht_player, ht_arena, ht_region,
-                    ht_challenge, ht_match, ht_matches_archive,
-                    ht_match_lineup, ht_league, ht_world)
-from pychpp import ht_error
+from pychpp import ht_circuit_breaker, ht_credentials, ht_error, ht_identity_map, ht_negative_cache, ht_oauth
+from pychpp import ht_single_flight, ht_string_table
+
+# rauth, requests and the ht_* model modules are imported lazily,
+# on first use, so that importing pychpp stays cheap
 
 
 class CHPP:
@@ -15,7 +13,14 @@ class CHPP:
     Manage connection and requests with Hattrick API
     """
 
-    def __init__(self, consumer_key, consumer_secret, access_token_key='', access_token_secret=''):
+    # Same default timeout as rauth sessions, in seconds
+    REQUEST_TIMEOUT = 300.0
+
+    # Maximum number of kept connections to Hattrick, shared by all threads
+    CONNECTION_POOL_SIZE = 32
+
+    def __init__(self, consumer_key, consumer_secret, access_token_key='', access_token_secret='', keep_raw=True,
+                 intern_strings=False, identity_map_ttl=0):
         """
         Initialization of a CHPP instance
 
@@ -28,31 +33,151 @@ class CHPP:
         :param consumer_secret: Consumer Secret of the application
         :param access_token_key: Access Token Key for the current user
         :param access_token_secret: Access Token Secret for the current user
+        :param keep_raw: define if models keep raw xml data once parsed,
+                         can be overridden for each model with keep_raw parameter
+        :param intern_strings: define if equal strings parsed from different responses
+                               are shared, through a bounded string table
+        :param identity_map_ttl: time during which parsed teams are reused instead of
+                                 being requested again, in seconds, 0 to always request them
         :type consumer_key: str
         :type consumer_secret: str
         :type access_token_key: str
         :type access_token_secret: str
+        :type keep_raw: bool
+        :type intern_strings: bool
+        :type identity_map_ttl: int, float
         :return: None
         """
+        if not isinstance(keep_raw, bool):
+            raise ValueError("keep_raw must be a boolean")
+        elif not isinstance(intern_strings, bool):
+            raise ValueError("intern_strings must be a boolean")
+
         self.consumer_key = consumer_key
         self.consumer_secret = consumer_secret
         self.access_token_key = access_token_key
         self.access_token_secret = access_token_secret
+        self.keep_raw = keep_raw
 
         self.request_token_url = "https://chpp.hattrick.org/oauth/request_token.ashx"
         self.access_token_url = "https://chpp.hattrick.org/oauth/access_token.ashx"
         self.authorize_url = "https://chpp.hattrick.org/oauth/authorize.aspx"
         self.base_url = "https://chpp.hattrick.org/chppxml.ashx"
 
-        self.service = OAuth1Service(
-            consumer_key=self.consumer_key,
-            consumer_secret=self.consumer_secret,
-            request_token_url=self.request_token_url,
-            access_token_url=self.access_token_url,
-            authorize_url=self.authorize_url,
-            base_url=self.base_url,
-            signature_obj=HmacSha1Signature,
-        )
+        self._service = None
+
+        # Requests are signed natively, rauth is only used to obtain tokens
+        self.signer = ht_oauth.HTOAuthSigner(consumer_key=self.consumer_key,
+                                             consumer_secret=self.consumer_secret,
+                                             access_token_key=self.access_token_key,
+                                             access_token_secret=self.access_token_secret,
+                                             )
+
+        # A single HTTP session, created on first use, is shared by all
+        # threads, so that its connections are reused by every thread pool
+        self._session = None
+        self._session_lock = threading.Lock()
+
+        # Teams parsed from teamdetails responses, so that teams listed in a
+        # response are not requested again for a while, disabled by default
+        self.identity_map = ht_identity_map.HTIdentityMap(ttl=identity_map_ttl)
+
+        # Strings shared between models of the session
+        self.string_table = ht_string_table.HTStringTable() if intern_strings else None
+
+        # Concurrent identical requests share one fetch and one parsed tree
+        self._single_flight = ht_single_flight.HTSingleFlight()
+
+        # Unknown IDs, so that they are not requested again
+        self.negative_cache = ht_negative_cache.HTNegativeCache()
+
+        # Requests fail fast while Hattrick is unavailable
+        self.circuit_breaker = ht_circuit_breaker.HTCircuitBreaker()
+
+    def __reduce__(self):
+        # Sessions are not pickled: the unpickling process uses its own
+        # CHPP instance for the same credentials and settings, which is an
+        # instance registered with ht_credentials._register if any
+        return (ht_credentials._connect, (self.credentials, self._settings()))
+
+    def _settings(self):
+        """
+        Settings of current instance, kept when it is pickled
+
+        :rtype: dict
+        """
+        return {"keep_raw": self.keep_raw,
+                "intern_strings": self.string_table is not None,
+                "identity_map_ttl": self.identity_map.ttl,
+                "failure_threshold": self.circuit_breaker.failure_threshold,
+                "recovery_timeout": self.circuit_breaker.recovery_timeout,
+                "stale_max_size": self.circuit_breaker.stale_max_size,
+                "negative_cache_size": self.negative_cache.max_size,
+                "negative_cache_ttl": self.negative_cache.ttl,
+                }
+
+    @staticmethod
+    def _from_settings(credentials, settings):
+        """
+        Build a CHPP instance from credentials and settings
+
+        :param credentials: credentials of the instance
+        :param settings: settings of the instance, as returned by _settings
+        :type credentials: ht_credentials.HTCredentials
+        :type settings: dict
+        :rtype: CHPP
+        """
+        chpp = CHPP(*credentials,
+                    keep_raw=settings["keep_raw"],
+                    intern_strings=settings["intern_strings"],
+                    identity_map_ttl=settings["identity_map_ttl"],
+                    )
+        chpp.circuit_breaker = ht_circuit_breaker.HTCircuitBreaker(failure_threshold=settings["failure_threshold"],
+                                                                   recovery_timeout=settings["recovery_timeout"],
+                                                                   stale_max_size=settings["stale_max_size"],
+                                                                   )
+        chpp.negative_cache = ht_negative_cache.HTNegativeCache(max_size=settings["negative_cache_size"],
+                                                                ttl=settings["negative_cache_ttl"],
+                                                                )
+        return chpp
+
+    @property
+    def credentials(self):
+        """
+        Credentials of current instance, which can be sent to other processes
+
+        :rtype: ht_credentials.HTCredentials
+        """
+        return ht_credentials.HTCredentials(consumer_key=self.consumer_key,
+                                            consumer_secret=self.consumer_secret,
+                                            access_token_key=self.access_token_key,
+                                            access_token_secret=self.access_token_secret,
+                                            )
+
+    @property
+    def service(self):
+        """
+        OAuth service used to obtain tokens from Hattrick
+
+        It is created on first use.
+
+        :rtype: rauth.OAuth1Service
+        """
+        if self._service is None:
+            from rauth import OAuth1Service
+            from rauth.oauth import HmacSha1Signature
+
+            self._service = OAuth1Service(
+                consumer_key=self.consumer_key,
+                consumer_secret=self.consumer_secret,
+                request_token_url=self.request_token_url,
+                access_token_url=self.access_token_url,
+                authorize_url=self.authorize_url,
+                base_url=self.base_url,
+                signature_obj=HmacSha1Signature,
+            )
+
+        return self._service
 
     @staticmethod
     def _analyze_error(xml_data):
@@ -203,36 +328,182 @@ class CHPP:
         """
         Open OAuth session
         """
+        from rauth import OAuth1Session
+
         return OAuth1Session(self.consumer_key,
                              self.consumer_secret,
                              access_token=self.access_token_key,
                              access_token_secret=self.access_token_secret,
                              )
 
-    def request(self, **kwargs):
+    def _http_session(self):
         """
-        Send a request via the CHPP API
+        HTTP session, shared by all threads
 
-        :return: xml data fetched on Hattrick
-        :rtype: xml.etree.ElementTree
+        Its connection pool keeps up to CONNECTION_POOL_SIZE connections
+        to Hattrick open.
+
+        :rtype: requests.Session
         """
-        session = self.open_session()
-        query = session.get(self.base_url, params=kwargs)
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                import requests.adapters
+
+                session = requests.Session()
+                session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1,
+                                                                        pool_maxsize=self.CONNECTION_POOL_SIZE))
+                self._session = session
+
+            return self._session
+
+    def request_raw(self, **kwargs):
+        """
+        Send a request via the CHPP API, without parsing the response
+
+        :return: xml document fetched on Hattrick
+        :rtype: str
+        """
+        query = self._http_session().get(self.base_url,
+                                         params=self.signer.sign("GET", self.base_url, kwargs),
+                                         timeout=self.REQUEST_TIMEOUT,
+                                         )
         query.encoding = "UTF-8"
 
         if query.status_code == 401:
             raise ht_error.HTUnauthorizedAction("The requested action seems to be unauthorized (401 error code). "
                                                 "Please heck your credentials scope.")
 
-        data = xml.etree.ElementTree.fromstring(query.text)
-        file_name = data.find("FileName").text
+        # Other error status codes, such as 5xx during maintenance, raise a
+        # requests.HTTPError
+        query.raise_for_status()
+
+        return query.text
+
+    @classmethod
+    def parse_response(cls, text):
+        """
+        Parse a xml document fetched on Hattrick
+
+        :param text: xml document returned by request_raw
+        :type text: str
+        :return: xml data
+        :rtype: xml.etree.ElementTree
+        """
+        data = xml.etree.ElementTree.fromstring(text)
+
+        # Pages which are not CHPP documents, such as maintenance pages,
+        # have no file name
+        file_name = data.findtext("FileName")
+        if not file_name:
+            raise ht_error.HTUndefinedError("Hattrick response is not a CHPP xml document")
 
         # If Hattrick returns an error, an exception is raised
         if file_name == "chpperror.xml":
-            self._analyze_error(data)
+            cls._analyze_error(data)
 
         return data
 
+    @staticmethod
+    def _request_key(kwargs):
+        """Key of a request, equal for requests sending the same query"""
+        return tuple(sorted((k, str(v)) for k, v in kwargs.items()))
+
+    @staticmethod
+    def _is_read_only(kwargs):
+        """Define if a request only reads data: it has no action type, or the view action type"""
+        return str(kwargs.get("actionType", "view")).lower() == "view"
+
+    def _send(self, kind, kwargs, fetch, use_negative_cache):
+        """
+        Send a request through negative cache, coalescing and circuit breaker
+
+        :param kind: kind of result returned by fetch, so that requests
+                     returning different kinds are never coalesced
+        :param kwargs: request arguments
+        :param fetch: function called without argument to send the request
+        :param use_negative_cache: define if errors kept for unknown IDs are raised
+        :type kind: str
+        :type kwargs: dict
+        :type fetch: callable
+        :type use_negative_cache: bool
+        :return: result of fetch
+        """
+        negative_key = self.negative_cache.key(kwargs)
+
+        if use_negative_cache and negative_key is not None:
+            error = self.negative_cache.get(negative_key)
+            if error is not None:
+                raise error
+
+        key = (kind, self._request_key(kwargs))
+        read_only = self._is_read_only(kwargs)
+        try:
+            # Only requests reading data are coalesced: each action is sent
+            if read_only:
+                result = self._single_flight.do(
+                    key, lambda: self.circuit_breaker.call(key, fetch, read_only=True))
+            else:
+                result = self.circuit_breaker.call(key, fetch, read_only=False)
+        except ht_negative_cache.UNKNOWN_ID_ERRORS as e:
+            if negative_key is not None:
+                self.negative_cache.add(negative_key, e)
+            raise
+
+        if not use_negative_cache and negative_key is not None:
+            self.negative_cache.discard(negative_key)
+
+        return result
+
+    def request(self, use_negative_cache=True, **kwargs):
+        """
+        Send a request via the CHPP API
+
+        If an identical request only reading data is already in flight, its
+        response is awaited instead of sending a new one, and its parsed tree
+        is shared: it must not be modified.
+
+        If Hattrick recently answered that an ID of the request is unknown
+        (see negative_cache), the same error is raised without any request.
+
+        While Hattrick is unavailable (see circuit_breaker), HTCircuitOpenError
+        is raised, or the last response to the same request is returned if
+        the circuit breaker keeps stale responses and the request only reads
+        data (no actionType other than "view").
+
+        :param use_negative_cache: define if errors kept for unknown IDs are raised,
+                                   set to False to request Hattrick anyway
+        :type use_negative_cache: bool
+        :return: xml data fetched on Hattrick
+        :rtype: xml.etree.ElementTree
+        """
+        return self._send("xml", kwargs,
+                          lambda: self.parse_response(self.request_raw(**kwargs)),
+                          use_negative_cache)
+
+    def request_text(self, use_negative_cache=True, **kwargs):
+        """
+        Send a request via the CHPP API, and check the response without parsing it
+
+        Like request, it goes through negative cache, coalescing and circuit
+        breaker. Only error responses, which are small, are parsed to raise
+        the relevant exception: the document is left to be parsed elsewhere,
+        for instance in another process.
+
+        :param use_negative_cache: define if errors kept for unknown IDs are raised,
+                                   set to False to request Hattrick anyway
+        :type use_negative_cache: bool
+        :return: xml document fetched on Hattrick
+        :rtype: str
+        """
+        def fetch():
+            text = self.request_raw(**kwargs)
+            if "<FileName>" not in text or "<FileName>chpperror.xml</FileName>" in text:
+                self.parse_response(text)
+            return text
+
+        return self._send("text", kwargs, fetch, use_negative_cache)
+
     def user(self, **kwargs):
         """
         Get a user from its Hattrick ID
@@ -240,8 +511,13 @@ class CHPP:
         If not ht_id is defined, return the connected user.
 
         :key ht_id: Hattrick ID of the requested user, must be an int
+        :key prefetch: related data to fetch concurrently, among "teams"
+        :key keep_raw: define if raw xml data are kept once parsed, defaults to CHPP.keep_raw
+        :key use_negative_cache: define if errors kept for unknown IDs are raised, defaults to True
         :rtype: ht_user.HTUser
         """
+        from pychpp import ht_user
+
         return ht_user.HTUser(chpp=self, **kwargs)
 
     def team(self, **kwargs):
@@ -250,10 +526,40 @@ class CHPP:
 
         If not ht_id is defined, return the primary team of connected user.
 
+        If identity_map_ttl is not 0, teams parsed for less than
+        identity_map_ttl seconds (see identity_map) are returned without
+        any request.
+
         :key ht_id: Hattrick ID of the requested team, must be an int
+        :key prefetch: related data to fetch concurrently, among "players", "arena", "user" or "youth_team"
+        :key keep_raw: define if raw xml data are kept once parsed, defaults to CHPP.keep_raw
+        :key use_negative_cache: define if errors kept for unknown IDs are raised, defaults to True
         :rtype: ht_team.HTTeam
         """
-        return ht_team.HTTeam(chpp=self, **kwargs)
+        from pychpp import ht_team
+
+        keep_raw = kwargs.pop("keep_raw", None)
+        keep_raw = keep_raw if keep_raw is not None else self.keep_raw
+
+        team = (self.identity_map.get(ht_team.HTTeam, kwargs["ht_id"])
+                if kwargs.get("ht_id") is not None else None)
+
+        # A known team without raw data can't be returned if they are requested
+        if team is not None and (team._data is not None or not keep_raw):
+            if kwargs.get("prefetch"):
+                team.prefetch(*kwargs["prefetch"])
+            return team
+
+        # Raw data are kept until other teams of the same user, which are
+        # part of the response, are parsed
+        team = ht_team.HTTeam(chpp=self, keep_raw=True, **kwargs)
+        if self.identity_map.enabled:
+            ht_team.HTTeam.from_teamdetails(chpp=self, data=team._data, keep_raw=keep_raw, exclude=team.ht_id)
+            self.identity_map.add(team)
+        if not keep_raw:
+            team._drop_raw()
+
+        return team
 
     def youth_team(self, **kwargs):
         """
@@ -262,8 +568,13 @@ class CHPP:
         If not ht_id is defined, return the youth primary team of connected user.
 
         :key ht_id: Hattrick ID of the requested youth team, must be an int
+        :key prefetch: related data to fetch concurrently, among "players"
+        :key keep_raw: define if raw xml data are kept once parsed, defaults to CHPP.keep_raw
+        :key use_negative_cache: define if errors kept for unknown IDs are raised, defaults to True
         :rtype: ht_team.HTYouthTeam
         """
+        from pychpp import ht_team
+
         return ht_team.HTYouthTeam(chpp=self, **kwargs)
 
     def player(self, **kwargs):
@@ -271,8 +582,13 @@ class CHPP:
         Get a player from its Hattrick ID
 
         :key ht_id: Hattrick ID of the requested player, must be an int
+        :key prefetch: related data to fetch concurrently, among "team"
+        :key keep_raw: define if raw xml data are kept once parsed, defaults to CHPP.keep_raw
+        :key use_negative_cache: define if errors kept for unknown IDs are raised, defaults to True
         :rtype: ht_player.HTPlayer
         """
+        from pychpp import ht_player
+
         return ht_player.HTPlayer(chpp=self, **kwargs)
 
     def youth_player(self, **kwargs):
@@ -280,8 +596,12 @@ class CHPP:
         Get a youth player from its Hattrick ID
 
         :key ht_id: Hattrick ID of the requested youth player, must be an int
+        :key keep_raw: define if raw xml data are kept once parsed, defaults to CHPP.keep_raw
+        :key use_negative_cache: define if errors kept for unknown IDs are raised, defaults to True
         :rtype: ht_player.HTYouthPlayer
         """
+        from pychpp import ht_player
+
         return ht_player.HTYouthPlayer(chpp=self, **kwargs)
 
     def arena(self, **kwargs):
@@ -291,8 +611,13 @@ class CHPP:
         If not ht_id is defined, return the primary team arena of connected user.
 
         :key ht_id: Hattrick ID of the requested arena, must be an int
+        :key prefetch: related data to fetch concurrently, among "team" or "region"
+        :key keep_raw: define if raw xml data are kept once parsed, defaults to CHPP.keep_raw
+        :key use_negative_cache: define if errors kept for unknown IDs are raised, defaults to True
         :rtype: ht_arena.HTArena
         """
+        from pychpp import ht_arena
+
         return ht_arena.HTArena(chpp=self, **kwargs)
 
     def region(self, **kwargs):
@@ -300,8 +625,12 @@ class CHPP:
         Get a region from his Hattrick ID
 
         :key ht_id: Hattrick ID of the requested region, must be an int
+        :key keep_raw: define if raw xml data are kept once parsed, defaults to CHPP.keep_raw
+        :key use_negative_cache: define if errors kept for unknown IDs are raised, defaults to True
         :rtype: ht_region.HTRegion
         """
+        from pychpp import ht_region
+
         return ht_region.HTRegion(chpp=self, **kwargs)
 
     def challenge_manager(self, **kwargs):
@@ -312,6 +641,8 @@ class CHPP:
                 :key period: concerned period, must be equal to 'week' or 'weekend'
                 :rtype: ht_challenge.HTChallengeManager
                 """
+        from pychpp import ht_challenge
+
         return ht_challenge.HTChallengeManager(chpp=self, **kwargs)
 
     def match(self, **kwargs):
@@ -319,10 +650,30 @@ class CHPP:
         Get a match from his Hattrick ID
 
         :key ht_id: Hattrick ID of the requested match, must be an int
+        :key prefetch: related data to fetch concurrently, among "home_team", "away_team" or "arena"
+        :key keep_raw: define if raw xml data are kept once parsed, defaults to CHPP.keep_raw
+        :key use_negative_cache: define if errors kept for unknown IDs are raised, defaults to True
         :rtype: ht_match.HTMatch
         """
+        from pychpp import ht_match
+
         return ht_match.HTMatch(chpp=self, **kwargs)
 
+    def match_with_lineups(self, **kwargs):
+        """
+        Get a match with lineups of both teams, requested concurrently
+
+        :key ht_id: Hattrick ID of the requested match, must be an int
+        :key home_team_id: Hattrick ID of home team if known, must be an int
+        :key away_team_id: Hattrick ID of away team if known, must be an int
+        :key events: define if match events have to be requested, must be a boolean
+        :key source: hattrick source to request ('hattrick', 'youth' or 'htointegrated')
+        :rtype: ht_match.HTMatch
+        """
+        from pychpp import ht_match
+
+        return ht_match.HTMatch.fetch_full(chpp=self, **kwargs)
+
     def matches_archive(self, **kwargs):
         """
         Get a matches archive
@@ -334,27 +685,147 @@ class CHPP:
         :key season: season to search matches, must be an integer
         :key hto: including or not tounaments matches, must be a boolean
         :return: a ht_matches_archive.HTMatchesArchive object
+        :key keep_raw: define if raw xml data are kept once parsed, defaults to CHPP.keep_raw
+        :key use_negative_cache: define if errors kept for unknown IDs are raised, defaults to True
         :rtype: ht_matches_archive.HTMatchesArchive
         """
+        from pychpp import ht_matches_archive
+
         return ht_matches_archive.HTMatchesArchive(chpp=self, **kwargs)
 
+    def matches_history(self, **kwargs):
+        """
+        Iterate over the whole matches history of a team
+
+        :key ht_id: Hattrick ID of team to search matches
+        :key youth: is requested mathes archive concerns a youth team, must be a boolean
+        :key hto: including or not tounaments matches, must be a boolean
+        :key seasons: seasons to walk, must be an iterable of integers
+        :key first_match_date: begin date of history, must be a datetime.datetime object
+        :key last_match_date: end date of history, must be a datetime.datetime object
+        :key window: length of date windows, must be a datetime.timedelta object
+        :key max_workers: maximum number of concurrent requests, must be an integer
+        :return: a generator of ht_matches_archive.HTMatchesArchiveItem objects
+        :rtype: generator
+        """
+        from pychpp import ht_matches_archive
+
+        return ht_matches_archive.HTMatchesArchive.iter_history(chpp=self, **kwargs)
+
+    def matches_archive_sync(self, **kwargs):
+        """
+        Get an incremental synchronizer of teams matches archives
+
+        :key state_path: path of the file where watermarks are saved, must be a str
+        :key handler: function called with team Hattrick ID and every new or updated match, must be callable
+        :key youth: define if synchronized teams are youth teams or not, must be a boolean
+        :key events: define if match events have to be requested, must be a boolean
+        :key first_match_date: begin date of first sync of a team, must be a datetime.datetime object
+        :key max_workers: maximum number of teams synchronized concurrently, must be an int
+        :rtype: ht_sync.HTMatchesArchiveSync
+        """
+        from pychpp import ht_sync
+
+        return ht_sync.HTMatchesArchiveSync(chpp=self, **kwargs)
+
     def league(self, **kwargs):
         """
         Get a league from his Hattrick ID
 
         :key ht_id: Hattrick ID of the requested league, must be an int
+        :key keep_raw: define if raw xml data are kept once parsed, defaults to CHPP.keep_raw
+        :key use_negative_cache: define if errors kept for unknown IDs are raised, defaults to True
         :rtype: ht_league.HTLeague
         """
+        from pychpp import ht_league
+
         return ht_league.HTLeague(chpp=self, **kwargs)
 
+    def league_crawler(self, **kwargs):
+        """
+        Get a crawler of leagues, their teams, players, arenas and users
+
+        :key sink: function called with every fetched entity, must be callable
+        :key include: entities to fetch for each team, among "players", "arena" and "user"
+        :key max_workers: maximum number of concurrent requests, must be an int
+        :key on_error: function called with entity kind, Hattrick ID and exception when a fetch fails
+        :rtype: ht_crawler.HTLeagueCrawler
+        """
+        from pychpp import ht_crawler
+
+        return ht_crawler.HTLeagueCrawler(chpp=self, **kwargs)
+
+    def world_crawler(self, **kwargs):
+        """
+        Get a resumable crawler of every region of the world
+
+        :key sink: function called with every fetched region, must be callable
+        :key checkpoint_path: path of the file where progress is saved, must be a str
+        :key rate: maximum number of requests per second, must be a number
+        :key max_workers: maximum number of concurrent requests, must be an int
+        :key league_ht_ids: Hattrick ID of country leagues to crawl (optional, default=all)
+        :key on_progress: function called with progress metrics each time a region is fetched
+        :rtype: ht_crawler.HTWorldCrawler
+        """
+        from pychpp import ht_crawler
+
+        return ht_crawler.HTWorldCrawler(chpp=self, **kwargs)
+
+    def parsing_pool(self, **kwargs):
+        """
+        Get a pool fetching documents in threads and parsing them in worker processes
+
+        :key processes: number of worker processes, must be an int (optional, default=number of processors)
+        :key max_workers: maximum number of concurrent requests, must be an int
+        :rtype: ht_parsing_pool.HTParsingPool
+        """
+        from pychpp import ht_parsing_pool
+
+        return ht_parsing_pool.HTParsingPool(chpp=self, **kwargs)
+
+    def refresh_scheduler(self, **kwargs):
+        """
+        Get a scheduler keeping tracked entities up to date in background threads
+
+        :key rate: maximum number of requests per second, must be a number
+        :key max_workers: maximum number of concurrent fetches, must be an int
+        :key on_update: function called with key and new value of an entity each time it is fetched
+        :key on_error: function called with key and raised exception when a fetch fails
+        :rtype: ht_scheduler.HTRefreshScheduler
+        """
+        from pychpp import ht_scheduler
+
+        return ht_scheduler.HTRefreshScheduler(chpp=self, **kwargs)
+
+    def live_match_tracker(self, **kwargs):
+        """
+        Get a tracker following live matches and sending their new events to subscribers
+
+        :key rate: maximum number of requests per second, must be a number
+        :key max_workers: maximum number of concurrent requests, must be an int
+        :key on_error: function called with match Hattrick ID and raised exception when a poll fails
+        :key play_interval: delay between two polls during play, in seconds
+        :key halftime_interval: delay between two polls at half-time, in seconds
+        :key idle_interval: maximum delay between two polls before kickoff, in seconds
+        :key kickoff_lead: time before kickoff from which play_interval is used, in seconds
+        :rtype: ht_live.HTLiveMatchTracker
+        """
+        from pychpp import ht_live
+
+        return ht_live.HTLiveMatchTracker(chpp=self, **kwargs)
+
     def match_lineup(self, **kwargs):
         """
         Get a match lineup from its Hattrick ID
 
         :key ht_id: Hattrick ID of the requested match, must be an int
         :key team_id: Hattrick ID of the team for each the lineup is requested, must be an int
+        :key keep_raw: define if raw xml data are kept once parsed, defaults to CHPP.keep_raw
+        :key use_negative_cache: define if errors kept for unknown IDs are raised, defaults to True
         :rtype: ht_match_lineup.HTMatchLineup
         """
+        from pychpp import ht_match_lineup
+
         return ht_match_lineup.HTMatchLineup(chpp=self, **kwargs)
 
     def world(self, **kwargs):
@@ -363,6 +834,10 @@ class CHPP:
 
         :key ht_id: Hattrick ID of the requested country league, must be an int (optional)
         :key include_regions: Whether or not to include regions for the countries, must be an bool (optional, default=False)
+        :key keep_raw: define if raw xml data are kept once parsed, defaults to CHPP.keep_raw
+        :key use_negative_cache: define if errors kept for unknown IDs are raised, defaults to True
         :rtype: ht_world.HTWorld
         """
+        from pychpp import ht_world
+
         return ht_world.HTWorld(chpp=self, **kwargs)
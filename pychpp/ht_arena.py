@@ -1,5 +1,5 @@
 from pychpp import ht_model, ht_xml
-from pychpp import ht_team, ht_region
+from pychpp import ht_region
 
 
 class HTArena(ht_model.HTModel):
@@ -46,12 +46,11 @@ class HTArena(ht_model.HTModel):
     def __repr__(self):
         return f"<{self.__class__.__name__} object : {self.name} ({self.ht_id})>"
 
-    @property
+    @ht_model.related
     def team(self):
-        return ht_team.HTTeam(chpp=self._chpp,
-                              ht_id=self.team_ht_id)
+        return self._chpp.team(ht_id=self.team_ht_id)
 
-    @property
+    @ht_model.related
     def region(self):
         return ht_region.HTRegion(chpp=self._chpp,
                                   ht_id=self.region_ht_id)
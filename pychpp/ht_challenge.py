@@ -1,18 +1,24 @@
 import xml.etree.ElementTree
 
 from pychpp import chpp as _chpp
-from pychpp import ht_xml
+from pychpp import ht_concurrency, ht_xml
 
 
 class HTChallengeManager:
     """
     Managing challenges on Hattrick
+
+    Request arguments are built for each call and never stored on the
+    instance, so one manager can be shared between threads.
     """
 
     _SOURCE_FILE = "challenges"
     _SOURCE_FILE_VERSION = "1.6"
     _ACTION_TYPE = "view"
 
+    # Maximum number of teams checked by a single challengeable request
+    _MAX_SUGGESTED_TEAMS = 50
+
     def __init__(self, chpp, team_ht_id=None, match_period="week"):
         """
         Initialize a HTChallengeManager instance
@@ -33,16 +39,35 @@ class HTChallengeManager:
 
         self._chpp = chpp
 
+        # Arguments common to every request, never modified: arguments of
+        # each call are added to a copy (see _request)
         self._REQUEST_ARGS = {"file": self._SOURCE_FILE,
                               "version": self._SOURCE_FILE_VERSION,
                               "teamId": str(team_ht_id) if team_ht_id is not None else "",
                               "isWeekendFriendly": {"week": "0", "weekend": "1"}[match_period],
                               }
 
-    def _set_tm_ht_id(self, training_match_ht_id):
+    def _request(self, action_type, **kwargs):
+        """
+        Send a request with common arguments and arguments of the current call
+
+        :param action_type: CHPP action type
+        :type action_type: str
+        :key: additional request arguments
+        :return: xml data fetched on Hattrick
+        :rtype: xml.etree.ElementTree.Element
+        """
+        request_args = dict(self._REQUEST_ARGS)
+        request_args["actionType"] = action_type
+        request_args.update(kwargs)
+
+        return self._chpp.request(**request_args)
+
+    @staticmethod
+    def _tm_ht_id_args(training_match_ht_id):
         if not isinstance(training_match_ht_id, int):
             raise ValueError("training_match_ht_id must be an integer")
-        self._REQUEST_ARGS["trainingMatchId"] = str(training_match_ht_id)
+        return {"trainingMatchId": str(training_match_ht_id)}
 
     def is_challengeable(self, team_ht_id):
         """
@@ -54,19 +79,18 @@ class HTChallengeManager:
         :rtype: dict
         """
 
-        self._REQUEST_ARGS["suggestedTeamIds"] = str()
-
         # Check team_ht_id integrity
         if isinstance(team_ht_id, int):
-            self._REQUEST_ARGS["suggestedTeamIds"] = str(team_ht_id)
+            suggested_team_ids = str(team_ht_id)
         elif (isinstance(team_ht_id, list)
               and all(isinstance(i, int) and type(i) != bool for i in team_ht_id)):
-            self._REQUEST_ARGS["suggestedTeamIds"] = ",".join(str(ht_id) for ht_id in team_ht_id)
+            suggested_team_ids = ",".join(str(ht_id) for ht_id in team_ht_id)
         else:
             raise ValueError("team_ht_id must be an int or a list of int")
 
-        self._REQUEST_ARGS["actionType"] = "challengeable"
-        data = self._chpp.request(**self._REQUEST_ARGS).find("Team").find("ChallengeableResult")
+        data = self._request("challengeable",
+                             suggestedTeamIds=suggested_team_ids,
+                             ).find("Team").find("ChallengeableResult")
 
         result_dict = {int(i.find("TeamId").text):
                        True if i.find('IsChallengeable').text == "True" else False
@@ -74,6 +98,69 @@ class HTChallengeManager:
 
         return result_dict
 
+    def iter_challengeable(self, team_ht_ids, chunk_size=None, max_workers=None):
+        """
+        Check availability of many teams, by chunks sent concurrently
+
+        Team IDs are split into chunks small enough to be accepted by Hattrick,
+        and results are yielded chunk by chunk as soon as they are fetched.
+
+        :param team_ht_ids: teams Hattrick ID to check availability
+        :param chunk_size: number of teams checked by request, defaults to the maximum accepted by Hattrick
+        :param max_workers: maximum number of concurrent requests
+        :type team_ht_ids: iterable of int
+        :type chunk_size: int, optional
+        :type max_workers: int, optional
+        :return: generator of dictionnaries with keys equal to tested team_ht_id and values equal to booleans
+        :rtype: generator
+        """
+        chunk_size = chunk_size if chunk_size is not None else self._MAX_SUGGESTED_TEAMS
+        if (not isinstance(chunk_size, int) or type(chunk_size) == bool
+                or not 0 < chunk_size <= self._MAX_SUGGESTED_TEAMS):
+            raise ValueError(f"chunk_size must be an integer between 1 and {self._MAX_SUGGESTED_TEAMS}")
+
+        def chunks():
+            seen = set()
+            team_ht_id_iter = iter(team_ht_ids)
+            while True:
+                chunk = list()
+                for ht_id in team_ht_id_iter:
+                    if not isinstance(ht_id, int) or type(ht_id) == bool:
+                        raise ValueError("team_ht_ids must only contain integers")
+                    if ht_id not in seen:
+                        seen.add(ht_id)
+                        chunk.append(ht_id)
+                        if len(chunk) == chunk_size:
+                            break
+                if not chunk:
+                    return
+                yield chunk
+
+        for _, result in ht_concurrency.bounded_imap(self.is_challengeable, chunks(), max_workers):
+            yield result
+
+    def is_challengeable_bulk(self, team_ht_ids, chunk_size=None, max_workers=None):
+        """
+        Check availability of many teams, by chunks sent concurrently
+
+        :param team_ht_ids: teams Hattrick ID to check availability
+        :param chunk_size: number of teams checked by request, defaults to the maximum accepted by Hattrick
+        :param max_workers: maximum number of concurrent requests
+        :type team_ht_ids: iterable of int
+        :type chunk_size: int, optional
+        :type max_workers: int, optional
+        :return: a dictionnary with keys equal to every tested team_ht_id and values equal to booleans
+        :rtype: dict
+        """
+        team_ht_ids = list(team_ht_ids)
+
+        result_dict = dict()
+        for result in self.iter_challengeable(team_ht_ids, chunk_size=chunk_size, max_workers=max_workers):
+            result_dict.update(result)
+
+        # Results are returned in the order of the requested teams
+        return {ht_id: result_dict[ht_id] for ht_id in team_ht_ids if ht_id in result_dict}
+
     def list(self, author="both", data=None):
         """
         List pending challenges for current team
@@ -95,8 +182,7 @@ class HTChallengeManager:
             if not isinstance(data, xml.etree.ElementTree.Element):
                 raise ValueError("if set, data must be an ElementTree.Element object")
         else:
-            self._REQUEST_ARGS["actionType"] = "view"
-            data = self._chpp.request(**self._REQUEST_ARGS).find("Team")
+            data = self._request("view").find("Team")
 
         challenges = list()
         for child in data:
@@ -142,15 +228,13 @@ class HTChallengeManager:
         elif not isinstance(arena_ht_id, int):
             raise ValueError("arena_ht_id must be an integer")
 
-        # Defined request arguments according to method parameters
-        self._REQUEST_ARGS["actionType"] = "challenge"
-        self._REQUEST_ARGS["opponentTeamId"] = str(opponent_team_ht_id)
-        self._REQUEST_ARGS["matchType"] = {"normal": "0", "cup_rules": "1"}[match_type]
-        self._REQUEST_ARGS["matchPlace"] = {"home": "0", "away": "1", "neutral": "2"}[match_place]
-        self._REQUEST_ARGS["neutralArenaId"] = str(arena_ht_id)
-
-        # Send Hattrick request
-        data = self._chpp.request(**self._REQUEST_ARGS)
+        # Send Hattrick request with arguments defined according to method parameters
+        data = self._request("challenge",
+                             opponentTeamId=str(opponent_team_ht_id),
+                             matchType={"normal": "0", "cup_rules": "1"}[match_type],
+                             matchPlace={"home": "0", "away": "1", "neutral": "2"}[match_place],
+                             neutralArenaId=str(arena_ht_id),
+                             )
 
         challenge = [c for c in self.list(data=data.find("Team"))
                      if c.opponent_team_ht_id == opponent_team_ht_id][0]
@@ -166,9 +250,7 @@ class HTChallengeManager:
         :return: the accepted challenge
         :rtype: HTChallenge
         """
-        self._REQUEST_ARGS["actionType"] = "accept"
-        self._set_tm_ht_id(training_match_ht_id)
-        data = self._chpp.request(**self._REQUEST_ARGS)
+        data = self._request("accept", **self._tm_ht_id_args(training_match_ht_id))
         challenge = [c for c in self.list(data=data.find("Team"))
                      if c.is_agreed is True][0]
         return challenge
@@ -180,9 +262,7 @@ class HTChallengeManager:
         :param training_match_ht_id: Hattrick ID of challenge to decline
         :type training_match_ht_id: int
         """
-        self._REQUEST_ARGS["actionType"] = "decline"
-        self._set_tm_ht_id(training_match_ht_id)
-        self._chpp.request(**self._REQUEST_ARGS)
+        self._request("decline", **self._tm_ht_id_args(training_match_ht_id))
 
     def withdraw(self, training_match_ht_id):
         """
@@ -191,9 +271,7 @@ class HTChallengeManager:
         :param training_match_ht_id: Hattrick ID of challenge to withdraw
         :type training_match_ht_id: int
         """
-        self._REQUEST_ARGS["actionType"] = "withdraw"
-        self._set_tm_ht_id(training_match_ht_id)
-        self._chpp.request(**self._REQUEST_ARGS)
+        self._request("withdraw", **self._tm_ht_id_args(training_match_ht_id))
 
 
 class HTChallenge:
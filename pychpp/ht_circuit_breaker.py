@@ -0,0 +1,193 @@
+import collections
+import threading
+import time
+import xml.etree.ElementTree
+
+from pychpp import ht_error
+
+# Errors meaning that Hattrick is unavailable: transport errors and error
+# status codes (requests exceptions are OSError subclasses), unparsable
+# responses, and undefined Hattrick errors, which include responses that
+# are not CHPP documents such as maintenance pages
+FAILURE_ERRORS = (OSError,
+                  xml.etree.ElementTree.ParseError,
+                  ht_error.HTUndefinedError,
+                  )
+
+
+class HTCircuitBreaker:
+    """
+    Stop sending requests while Hattrick is unavailable
+
+    The circuit is closed while requests succeed. After failure_threshold
+    consecutive failures (see FAILURE_ERRORS), it is opened: requests fail
+    fast with HTCircuitOpenError, or get the last response to the same
+    request if stale_max_size is not 0 and the request only reads data. Once recovery_timeout is elapsed,
+    it is half-opened: a single request is sent as a probe, which closes
+    the circuit if it succeeds, or opens it again if it fails. It can be
+    shared between threads.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0, stale_max_size=0):
+        """
+        Initialize a HTCircuitBreaker instance
+
+        :param failure_threshold: number of consecutive failures opening the circuit
+        :param recovery_timeout: delay before probing Hattrick once the circuit is open, in seconds
+        :param stale_max_size: maximum number of responses kept to be served while the circuit
+                               is open, 0 to keep none
+        :type failure_threshold: int
+        :type recovery_timeout: int, float
+        :type stale_max_size: int
+        """
+        if not isinstance(failure_threshold, int) or failure_threshold < 1:
+            raise ValueError("failure_threshold must be a positive integer")
+        elif (not isinstance(recovery_timeout, (int, float)) or type(recovery_timeout) == bool
+              or recovery_timeout <= 0):
+            raise ValueError("recovery_timeout must be a positive number")
+        elif not isinstance(stale_max_size, int) or stale_max_size < 0:
+            raise ValueError("stale_max_size must be an integer greater than or equal to 0")
+
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.stale_max_size = stale_max_size
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        # Incremented each time the circuit is opened from closed state, or
+        # closed, so that outcomes of older requests are ignored
+        self._generation = 0
+        self._stale = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """
+        State of the circuit, CLOSED, OPEN or HALF_OPEN
+
+        :rtype: str
+        """
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() >= self._opened_at + self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def reset(self):
+        """
+        Close the circuit, and forget kept responses
+        """
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+            self._generation += 1
+            self._stale.clear()
+
+    def _acquire(self):
+        """
+        Define if a request can be sent, and reserve the probe if needed
+
+        :return: token to give to _record once the request is finished,
+                 or None if the request can't be sent
+        """
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() >= self._opened_at + self.recovery_timeout:
+                self._state = self.HALF_OPEN
+
+            if self._state == self.CLOSED:
+                return (self._generation, False)
+            elif self._state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return (self._generation, True)
+            return None
+
+    def _record(self, token, failed):
+        """
+        Record the outcome of a request
+
+        :param token: token returned by _acquire for the request
+        :param failed: define if the request failed, None if it was interrupted
+        """
+        generation, probe = token
+
+        with self._lock:
+            if generation != self._generation:
+                # Request was sent before the circuit was last opened from
+                # closed state, closed or reset: its outcome is outdated
+                return
+            elif probe:
+                # Only the probe itself releases the probe
+                self._probing = False
+
+            if failed is None:
+                return
+            elif not failed:
+                if probe:
+                    self._state = self.CLOSED
+                    self._generation += 1
+                self._failures = 0
+            elif probe or self._failures + 1 >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._failures = 0
+                if not probe:
+                    self._generation += 1
+            else:
+                self._failures += 1
+
+    def call(self, key, function, read_only=True):
+        """
+        Send a request through the circuit
+
+        :param key: key of the request, used to find a stale response
+        :param function: function called without argument to send the request
+        :param read_only: define if the request only reads data, only responses
+                          to such requests are kept and served while the circuit is open
+        :type key: hashable
+        :type function: callable
+        :type read_only: bool
+        :return: result of the function, or stale result if the circuit is open
+        """
+        token = self._acquire()
+        if token is None:
+            stale = None
+            if read_only:
+                with self._lock:
+                    stale = self._stale.get(key)
+                    if stale is not None:
+                        self._stale.move_to_end(key)
+            if stale is not None:
+                return stale
+            raise ht_error.HTCircuitOpenError("Hattrick seems to be unavailable, "
+                                              "the request has not been sent")
+
+        # Interrupted requests only release the probe
+        failed = None
+        try:
+            result = function()
+            failed = False
+        except FAILURE_ERRORS:
+            failed = True
+            raise
+        except Exception:
+            # Other errors are answers of Hattrick, which is available
+            failed = False
+            raise
+        finally:
+            self._record(token, failed)
+
+        if read_only and self.stale_max_size:
+            with self._lock:
+                self._stale[key] = result
+                self._stale.move_to_end(key)
+                while len(self._stale) > self.stale_max_size:
+                    self._stale.popitem(last=False)
+
+        return result
@@ -0,0 +1,86 @@
+import concurrent.futures
+import itertools
+
+# Default number of concurrent requests sent to Hattrick
+DEFAULT_MAX_WORKERS = 8
+
+
+def resolve_max_workers(max_workers):
+    """
+    Check a maximum number of concurrent calls, or get the default one
+
+    :param max_workers: maximum number of concurrent calls, None for DEFAULT_MAX_WORKERS
+    :type max_workers: int, optional
+    :return: maximum number of concurrent calls
+    :rtype: int
+    """
+    if max_workers is None:
+        return DEFAULT_MAX_WORKERS
+    elif not isinstance(max_workers, int) or type(max_workers) == bool or max_workers < 1:
+        raise ValueError("max_workers must be a positive integer")
+    return max_workers
+
+
+def bounded_imap(func, iterable, max_workers=None):
+    """
+    Apply a function to every item of an iterable in a thread pool
+
+    Results are yielded as soon as they are available, together with
+    the item they were computed from. At most max_workers items are
+    in flight at a time, so the iterable is consumed lazily and memory
+    stays bounded. An exception raised by func is propagated and
+    pending items are cancelled.
+
+    :param func: function to call with each item
+    :param iterable: items to process
+    :param max_workers: maximum number of concurrent calls, defaults to DEFAULT_MAX_WORKERS
+    :type func: callable
+    :type iterable: iterable
+    :type max_workers: int, optional
+    :return: generator of (item, result) tuples, in completion order
+    :rtype: generator
+    """
+    max_workers = resolve_max_workers(max_workers)
+    items = iter(iterable)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(func, item): item
+                   for item in itertools.islice(items, max_workers)}
+        try:
+            while pending:
+                done, _ = concurrent.futures.wait(pending,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                results = [(pending.pop(future), future.result()) for future in done]
+
+                # Refill the pool before handing results to the caller
+                for item in itertools.islice(items, len(done)):
+                    pending[executor.submit(func, item)] = item
+
+                yield from results
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def bounded_map(func, iterable, max_workers=None):
+    """
+    Apply a function to every item of an iterable in a thread pool
+
+    :param func: function to call with each item
+    :param iterable: items to process
+    :param max_workers: maximum number of concurrent calls, defaults to DEFAULT_MAX_WORKERS
+    :type func: callable
+    :type iterable: iterable
+    :type max_workers: int, optional
+    :return: results, in the order of the iterable
+    :rtype: list
+    """
+    max_workers = resolve_max_workers(max_workers)
+    items = list(iterable)
+    if len(items) <= 1:
+        return [func(item) for item in items]
+
+    max_workers = min(max_workers, len(items))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, items))
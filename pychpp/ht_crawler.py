@@ -0,0 +1,311 @@
+import collections
+import concurrent.futures
+import itertools
+import os
+import time
+
+from pychpp import chpp as _chpp
+from pychpp import ht_arena, ht_concurrency, ht_league, ht_rate_limiter, ht_region, ht_storage, ht_user, ht_world
+
+
+class HTLeagueCrawler:
+    """
+    Crawl leagues and their teams, players, arenas and users
+
+    Starting from league ranks, every team is fetched, then its players,
+    arena and user. Each entity is fetched only once per crawler, even if
+    it is reached several times, unless its fetch failed. At most
+    max_workers requests are in flight at a time.
+    """
+
+    RELATED = ("players", "arena", "user")
+
+    def __init__(self, chpp, sink, include=RELATED, max_workers=None, on_error=None):
+        """
+        Initialize a HTLeagueCrawler instance
+
+        :param chpp: CHPP instance of connected user
+        :param sink: function called with every fetched entity (HTLeague, HTTeam,
+                     HTPlayer, HTArena or HTUser), always from the crawling thread
+        :param include: entities to fetch for each team, among "players", "arena" and "user"
+        :param max_workers: maximum number of concurrent requests
+        :param on_error: function called with the entity kind, its Hattrick ID and the raised
+                         exception when a fetch fails, defaults to None (exception is raised)
+        :type chpp: CHPP
+        :type sink: callable
+        :type include: iterable of str
+        :type max_workers: int, optional
+        :type on_error: callable, optional
+        """
+        if not isinstance(chpp, _chpp.CHPP):
+            raise ValueError("chpp must be a CHPP instance")
+        elif not callable(sink):
+            raise ValueError("sink must be callable")
+        elif not set(include) <= set(self.RELATED):
+            raise ValueError("include items must be equal to 'players', 'arena' or 'user'")
+        elif on_error is not None and not callable(on_error):
+            raise ValueError("on_error must be callable")
+
+        self._chpp = chpp
+        self._sink = sink
+        self._include = set(include)
+        self._max_workers = ht_concurrency.resolve_max_workers(max_workers)
+        self._on_error = on_error
+
+        # (kind, Hattrick ID) of every entity already fetched and sent to sink
+        self._seen = set()
+        # Tasks which failed or were not run by previous crawls
+        self._retry = list()
+
+    def _fetch(self, kind, ht_id, team=None):
+        if kind == "league":
+            return ht_league.HTLeague(chpp=self._chpp, ht_id=ht_id)
+        elif kind == "team":
+            return self._chpp.team(ht_id=ht_id)
+        elif kind == "players":
+            return team.players
+        elif kind == "arena":
+            return ht_arena.HTArena(chpp=self._chpp, ht_id=ht_id)
+        elif kind == "user":
+            return ht_user.HTUser(chpp=self._chpp, ht_id=ht_id)
+
+    def _expand(self, kind, entity):
+        """Tasks to run once an entity is fetched"""
+        if kind == "league":
+            return [("team", r.team_ht_id, None) for r in entity.ranks]
+
+        elif kind == "team":
+            tasks = list()
+            if "players" in self._include:
+                tasks.append(("players", entity.ht_id, entity))
+            if "arena" in self._include and entity.arena_ht_id:
+                tasks.append(("arena", entity.arena_ht_id, None))
+            if "user" in self._include and entity.user_ht_id:
+                tasks.append(("user", entity.user_ht_id, None))
+            return tasks
+
+        return []
+
+    def crawl(self, league_ht_ids):
+        """
+        Crawl leagues
+
+        Can be called several times: entities fetched by previous calls
+        are not fetched again, while entities whose fetch failed, or which
+        were not fetched because a previous call was interrupted, are.
+
+        :param league_ht_ids: Hattrick ID of leagues (league level units) to crawl
+        :type league_ht_ids: iterable of int
+        :return: number of fetched entities by kind
+        :rtype: dict
+        """
+        counts = collections.Counter()
+        backlog = collections.deque(self._retry)
+        backlog.extend(("league", ht_id, None) for ht_id in league_ht_ids)
+        self._retry = list()
+        # (kind, Hattrick ID) of every entity scheduled by this crawl
+        scheduled = set()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            pending = dict()
+
+            try:
+                while backlog or pending:
+                    # Only max_workers tasks are submitted at a time, others wait in backlog
+                    while backlog and len(pending) < self._max_workers:
+                        kind, ht_id, team = backlog.popleft()
+                        if (kind, ht_id) in self._seen or (kind, ht_id) in scheduled:
+                            continue
+                        scheduled.add((kind, ht_id))
+                        pending[executor.submit(self._fetch, kind, ht_id, team)] = (kind, ht_id, team)
+
+                    if not pending:
+                        continue
+
+                    done, _ = concurrent.futures.wait(pending,
+                                                      return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        task = pending.pop(future)
+                        kind, ht_id, _ = task
+                        try:
+                            entity = future.result()
+                        except Exception as e:
+                            self._retry.append(task)
+                            if self._on_error is None:
+                                raise
+                            self._on_error(kind, ht_id, e)
+                            continue
+
+                        for item in (entity if kind == "players" else [entity]):
+                            self._sink(item)
+                            counts[kind] += 1
+                        self._seen.add((kind, ht_id))
+
+                        backlog.extend(self._expand(kind, entity))
+
+            finally:
+                for future in pending:
+                    future.cancel()
+                self._retry.extend(pending.values())
+                self._retry.extend(backlog)
+
+        return dict(counts)
+
+
+class HTWorldCrawler:
+    """
+    Crawl every region of the world, with resumable progress
+
+    The list of countries and regions is fetched once from world details and
+    saved to a checkpoint file. Each fetched region is then appended to a log
+    next to it, so that an interrupted crawl resumes where it stopped, without
+    requesting again world details or already fetched regions. The log is
+    synced to disk every SYNC_EVERY regions: after a system crash, the last
+    regions may be fetched again.
+    """
+
+    _CHECKPOINT_VERSION = 2
+
+    # Number of fetched regions between two syncs of the log
+    SYNC_EVERY = 100
+
+    def __init__(self, chpp, sink, checkpoint_path, rate=None, max_workers=None,
+                 league_ht_ids=None, on_progress=None):
+        """
+        Initialize a HTWorldCrawler instance
+
+        :param chpp: CHPP instance of connected user
+        :param sink: function called with every fetched HTRegion, always from the crawling thread
+        :param checkpoint_path: path of the file where progress is saved
+        :param rate: maximum number of requests per second, requests being evenly spread,
+                     defaults to None (no limit)
+        :param max_workers: maximum number of concurrent requests
+        :param league_ht_ids: Hattrick ID of country leagues to crawl, defaults to None (all countries)
+        :param on_progress: function called with a dictionnary of progress metrics
+                            each time a region is fetched
+        :type chpp: CHPP
+        :type sink: callable
+        :type checkpoint_path: str
+        :type rate: int, float, optional
+        :type max_workers: int, optional
+        :type league_ht_ids: iterable of int, optional
+        :type on_progress: callable, optional
+        """
+        if not isinstance(chpp, _chpp.CHPP):
+            raise ValueError("chpp must be a CHPP instance")
+        elif not callable(sink):
+            raise ValueError("sink must be callable")
+        elif on_progress is not None and not callable(on_progress):
+            raise ValueError("on_progress must be callable")
+
+        self._chpp = chpp
+        self._sink = sink
+        self._checkpoint_path = checkpoint_path
+        self._rate_limiter = ht_rate_limiter.HTRateLimiter(rate) if rate is not None else None
+        self._max_workers = ht_concurrency.resolve_max_workers(max_workers)
+        self._league_ht_ids = set(league_ht_ids) if league_ht_ids is not None else None
+        self._on_progress = on_progress
+
+    def _load_checkpoint(self):
+        checkpoint = ht_storage.load_json(self._checkpoint_path)
+
+        if checkpoint is not None and checkpoint.get("version") != self._CHECKPOINT_VERSION:
+            raise ValueError(f"{self._checkpoint_path} is not a compatible checkpoint file")
+
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint):
+        ht_storage.dump_json(self._checkpoint_path, checkpoint)
+
+    @property
+    def _done_path(self):
+        """Path of the log of fetched regions"""
+        return f"{self._checkpoint_path}.done"
+
+    def _plan(self):
+        """Countries and regions to crawl, from world details"""
+        self._throttle()
+        world = ht_world.HTWorld(chpp=self._chpp, include_regions=True)
+
+        countries = dict()
+        for league in world.leagues:
+            if self._league_ht_ids is not None and league.ht_id not in self._league_ht_ids:
+                continue
+            country = league.country
+            countries[str(country.ht_id)] = {"name": country.country_name,
+                                             "regions": [int(r.ht_id) for r in (country.regions or [])],
+                                             }
+
+        return countries
+
+    def _throttle(self):
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire()
+
+    def _fetch_region(self, region_ht_id):
+        self._throttle()
+        return ht_region.HTRegion(chpp=self._chpp, ht_id=region_ht_id)
+
+    def crawl(self):
+        """
+        Crawl regions, resuming from checkpoint file if it exists
+
+        :return: progress metrics of the whole crawl
+        :rtype: dict
+        """
+        checkpoint = self._load_checkpoint()
+        if checkpoint is None:
+            checkpoint = {"version": self._CHECKPOINT_VERSION, "countries": self._plan()}
+            # Log of a previous crawl is discarded before the new plan is saved
+            ht_storage.dump_lines(self._done_path, [])
+            self._save_checkpoint(checkpoint)
+
+        done = {int(r) for r in ht_storage.load_lines(self._done_path)}
+        # Log is rewritten once, without a line left incomplete by a crash,
+        # then regions are only appended to it
+        ht_storage.dump_lines(self._done_path, sorted(done))
+        countries = checkpoint["countries"]
+
+        # Regions are interleaved across countries so that every country progresses steadily
+        region_country = dict()
+        queues = [[r for r in c["regions"] if r not in done] for c in countries.values()]
+        for country_ht_id, c in countries.items():
+            for r in c["regions"]:
+                region_country[r] = country_ht_id
+        todo = [r for batch in itertools.zip_longest(*queues) for r in batch if r is not None]
+
+        country_done = collections.Counter(region_country[r] for r in done if r in region_country)
+        start_time = time.monotonic()
+        fetched = 0
+
+        with open(self._done_path, "a", encoding="utf-8") as done_log:
+            try:
+                for region_ht_id, region in ht_concurrency.bounded_imap(self._fetch_region, todo,
+                                                                        self._max_workers):
+                    self._sink(region)
+
+                    done.add(region_ht_id)
+                    done_log.write(f"{region_ht_id}\n")
+                    done_log.flush()
+                    if (fetched + 1) % self.SYNC_EVERY == 0:
+                        os.fsync(done_log.fileno())
+
+                    fetched += 1
+                    country_ht_id = region_country[region_ht_id]
+                    country_done[country_ht_id] += 1
+
+                    if self._on_progress is not None:
+                        elapsed = time.monotonic() - start_time
+                        self._on_progress({"country_ht_id": int(country_ht_id),
+                                           "country_name": countries[country_ht_id]["name"],
+                                           "country_done": country_done[country_ht_id],
+                                           "country_total": len(countries[country_ht_id]["regions"]),
+                                           "done": len(done),
+                                           "total": len(region_country),
+                                           "elapsed": elapsed,
+                                           "rate": fetched / elapsed if elapsed else 0.0,
+                                           })
+            finally:
+                os.fsync(done_log.fileno())
+
+        return {"done": len(done), "total": len(region_country), "fetched": fetched}
@@ -0,0 +1,87 @@
+import collections
+import threading
+import weakref
+
+# CHPP instances used for credentials in the current process, they are
+# forgotten once no object uses them anymore
+_instances = weakref.WeakValueDictionary()
+_instances_lock = threading.Lock()
+
+
+def _key(credentials, settings):
+    return tuple(credentials), tuple(sorted(settings.items()))
+
+
+def _register(chpp):
+    """
+    Use a CHPP instance for its credentials and settings in the current process
+
+    Objects unpickled later with the same credentials and settings are
+    attached to it. Pickling never registers an instance, so that objects
+    are only attached to an instance registered on purpose.
+    """
+    with _instances_lock:
+        _instances[_key(chpp.credentials, chpp._settings())] = chpp
+
+
+def _connect(credentials, settings, chpp=None):
+    """
+    Get the CHPP instance of the current process for credentials and settings
+
+    It is created on first call, or chpp is used if given, then shared by
+    later calls with same credentials and settings.
+
+    :param credentials: credentials of the instance
+    :param settings: settings of the instance (see CHPP._settings)
+    :param chpp: instance to use if none is known yet
+    :type credentials: HTCredentials
+    :type settings: dict
+    :type chpp: CHPP, optional
+    :rtype: CHPP
+    """
+    key = _key(credentials, settings)
+
+    with _instances_lock:
+        instance = _instances.get(key)
+        if instance is None:
+            from pychpp import chpp as _chpp
+
+            instance = _instances[key] = (chpp if chpp is not None
+                                          else _chpp.CHPP._from_settings(credentials, settings))
+
+    return instance
+
+
+class HTCredentials(collections.namedtuple("HTCredentials", ["consumer_key",
+                                                             "consumer_secret",
+                                                             "access_token_key",
+                                                             "access_token_secret"])):
+    """
+    Credentials of a CHPP connection
+
+    Unlike a CHPP instance, it holds no session and can be sent to other
+    processes. CHPP instances, and models holding them, are pickled as
+    credentials and settings: in the unpickling process, they are replaced
+    by a CHPP instance built on first use and shared by every object pickled
+    with the same credentials and settings.
+    """
+
+    __slots__ = ()
+
+    def connect(self, **kwargs):
+        """
+        Get a CHPP instance using these credentials
+
+        The instance is built on first call, then shared by every call
+        with the same credentials and options in the current process, as
+        long as it is used.
+
+        :key keep_raw: define if models keep raw xml data once parsed
+        :key intern_strings: define if equal parsed strings are shared
+        :key identity_map_ttl: time during which parsed teams are reused, in seconds
+        :rtype: CHPP
+        """
+        from pychpp import chpp as _chpp
+
+        chpp = _chpp.CHPP(*self, **kwargs)
+        return _connect(self, chpp._settings(), chpp)
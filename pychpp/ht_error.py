@@ -70,6 +70,10 @@ class HTUndefinedError(HTError):
     """Raise when error occurs with Hattrick request"""
 
 
+class HTCircuitOpenError(HTError):
+    """Raise when requests are not sent because Hattrick seems to be unavailable"""
+
+
 class HTSkillError(HTError):
     """Raise when skill can't be well defined"""
 
@@ -0,0 +1,106 @@
+import collections
+import threading
+import time
+
+
+class HTIdentityMap:
+    """
+    Models already built during a session, by class and Hattrick ID
+
+    Models are forgotten ttl seconds after being added, so that data is
+    never older than ttl. They are kept in least recently used order: when
+    max_size is reached, the least recently used model is forgotten. It can
+    be shared between threads.
+    """
+
+    def __init__(self, max_size=1024, ttl=60.0):
+        """
+        Initialize a HTIdentityMap instance
+
+        :param max_size: maximum number of kept models, 0 to keep none
+        :param ttl: time during which a model is kept, in seconds, 0 to keep none
+        :type max_size: int
+        :type ttl: int, float
+        """
+        if not isinstance(max_size, int) or max_size < 0:
+            raise ValueError("max_size must be an integer greater than or equal to 0")
+        elif not isinstance(ttl, (int, float)) or type(ttl) == bool or ttl < 0:
+            raise ValueError("ttl must be a number greater than or equal to 0")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        # (expiration time, model) by (class, Hattrick ID)
+        self._models = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """
+        Define if models are kept
+
+        :rtype: bool
+        """
+        return self.max_size > 0 and self.ttl > 0
+
+    def __len__(self):
+        return len(self._models)
+
+    def __contains__(self, key):
+        return key in self._models
+
+    def get(self, cls, ht_id):
+        """
+        Get a model from its class and Hattrick ID
+
+        :param cls: class of the model
+        :param ht_id: Hattrick ID of the model
+        :type cls: type
+        :type ht_id: int
+        :return: model, or None if it is not known or expired
+        :rtype: ht_model.HTModel
+        """
+        with self._lock:
+            item = self._models.get((cls, ht_id))
+            if item is None:
+                return None
+            elif item[0] <= time.monotonic():
+                del self._models[(cls, ht_id)]
+                return None
+            self._models.move_to_end((cls, ht_id))
+
+        return item[1]
+
+    def add(self, model):
+        """
+        Add a model, replacing the one with the same class and Hattrick ID if any
+
+        :param model: model to add, must have a ht_id attribute
+        :type model: ht_model.HTModel
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._models[(type(model), model.ht_id)] = (time.monotonic() + self.ttl, model)
+            self._models.move_to_end((type(model), model.ht_id))
+            while len(self._models) > self.max_size:
+                self._models.popitem(last=False)
+
+    def discard(self, cls, ht_id):
+        """
+        Forget a model, if it is known
+
+        :param cls: class of the model
+        :param ht_id: Hattrick ID of the model
+        :type cls: type
+        :type ht_id: int
+        """
+        with self._lock:
+            self._models.pop((cls, ht_id), None)
+
+    def clear(self):
+        """
+        Forget every model
+        """
+        with self._lock:
+            self._models.clear()
@@ -0,0 +1,255 @@
+import heapq
+import itertools
+import time
+
+from pychpp import ht_match, ht_scheduler, ht_xml
+
+
+class _HTLiveMatch:
+    """Match followed by a HTLiveMatchTracker"""
+
+    def __init__(self, source):
+        self.source = source
+        self.seen = 0
+        self.state = None
+        self.due = time.monotonic()
+        self.in_flight = False
+
+
+class HTLiveMatchTracker(ht_scheduler._HTScheduler):
+    """
+    Follow live matches and send their new events to subscribers
+
+    Match details of every followed match are polled adaptively: slowly
+    until kickoff, quickly during play, and slowly again at half-time. Only
+    events beyond the last seen one are parsed, and subscribers receive
+    new events only. A match is not followed anymore once it is finished.
+    """
+
+    def __init__(self, chpp, rate=None, max_workers=None, on_error=None,
+                 play_interval=30.0, halftime_interval=180.0, idle_interval=900.0, kickoff_lead=120.0):
+        """
+        Initialize a HTLiveMatchTracker instance
+
+        :param chpp: CHPP instance of connected user
+        :param rate: maximum number of requests per second, defaults to None (no limit)
+        :param max_workers: maximum number of concurrent requests
+        :param on_error: function called with match Hattrick ID and raised exception when a poll fails
+        :param play_interval: delay between two polls during play, in seconds
+        :param halftime_interval: delay between two polls at half-time, in seconds
+        :param idle_interval: maximum delay between two polls before kickoff, in seconds
+        :param kickoff_lead: time before kickoff from which play_interval is used, in seconds
+        :type chpp: CHPP
+        :type rate: int, float, optional
+        :type max_workers: int, optional
+        :type on_error: callable, optional
+        :type play_interval: int, float
+        :type halftime_interval: int, float
+        :type idle_interval: int, float
+        :type kickoff_lead: int, float
+        """
+        super().__init__(chpp, rate=rate, max_workers=max_workers, on_error=on_error)
+
+        for name, value in (("play_interval", play_interval), ("halftime_interval", halftime_interval),
+                            ("idle_interval", idle_interval)):
+            if not isinstance(value, (int, float)) or type(value) == bool or value <= 0:
+                raise ValueError(f"{name} must be a positive number")
+        if not isinstance(kickoff_lead, (int, float)) or type(kickoff_lead) == bool or kickoff_lead < 0:
+            raise ValueError("kickoff_lead must be a number greater than or equal to 0")
+
+        self.play_interval = play_interval
+        self.halftime_interval = halftime_interval
+        self.idle_interval = idle_interval
+        self.kickoff_lead = kickoff_lead
+
+        self._subscribers = list()
+        self._matches = dict()
+        # (due, sequence number, match Hattrick ID) of every scheduled poll
+        self._schedule = list()
+        self._sequence = itertools.count()
+
+    def subscribe(self, callback):
+        """
+        Subscribe to new events of followed matches
+
+        :param callback: function called with match Hattrick ID, list of new events
+                         and match state each time new events are fetched or a match
+                         is finished, from a worker thread. Match state is a dictionary
+                         with match_date, home_goals, away_goals, events (number of events),
+                         second_half and finished keys.
+        :type callback: callable
+        """
+        if not callable(callback):
+            raise ValueError("callback must be callable")
+
+        with self._condition:
+            self._subscribers.append(callback)
+
+    def follow(self, match_ht_id, source="hattrick"):
+        """
+        Follow a match
+
+        :param match_ht_id: Hattrick ID of match
+        :param source: hattrick source to request ('hattrick', 'youth' or 'htointegrated')
+        :type match_ht_id: int
+        :type source: str
+        """
+        if not isinstance(match_ht_id, int):
+            raise ValueError("match_ht_id must be an integer")
+        elif source not in ("hattrick", "youth", "htointegrated"):
+            raise ValueError("source must be equal to 'hattrick, 'youth' or 'htointegrated'")
+
+        with self._condition:
+            if match_ht_id not in self._matches:
+                match = self._matches[match_ht_id] = _HTLiveMatch(source)
+                heapq.heappush(self._schedule, (match.due, next(self._sequence), match_ht_id))
+                self._condition.notify_all()
+
+    def unfollow(self, match_ht_id):
+        """
+        Stop following a match
+
+        :param match_ht_id: Hattrick ID of match
+        :type match_ht_id: int
+        """
+        with self._condition:
+            self._matches.pop(match_ht_id, None)
+            self._condition.notify_all()
+
+    def following(self):
+        """
+        Hattrick ID of followed matches
+
+        :rtype: list of int
+        """
+        with self._condition:
+            return list(self._matches)
+
+    def state(self, match_ht_id):
+        """
+        Last known state of a followed match
+
+        :param match_ht_id: Hattrick ID of match
+        :type match_ht_id: int
+        :return: match state (see subscribe), or None if not polled yet
+        :rtype: dict
+        """
+        with self._condition:
+            match = self._matches.get(match_ht_id)
+            return dict(match.state) if match is not None and match.state is not None else None
+
+    def _delay(self, match, now):
+        """
+        Delay before next poll of a match, according to its state
+
+        now is the date when match details were fetched, given by Hattrick,
+        as match dates are in Hattrick timezone and not in the local one.
+        If it is unknown, the match is polled again after play_interval.
+        """
+        state = match.state
+        if now is None:
+            return self.play_interval
+
+        until_kickoff = (state["match_date"] - now).total_seconds()
+
+        if until_kickoff > self.kickoff_lead:
+            return min(until_kickoff - self.kickoff_lead, self.idle_interval)
+
+        # Second half starts 15 minutes after the end of the first one
+        elapsed = -until_kickoff
+        if 45 * 60 <= elapsed < 60 * 60 and not state["second_half"]:
+            return min(self.halftime_interval, max(60 * 60 - elapsed, self.play_interval))
+
+        return self.play_interval
+
+    def _process(self, match_ht_id, match):
+        """Poll a match, and send its new events to subscribers"""
+        try:
+            response = self._chpp.request(file=ht_match.HTMatch._SOURCE_FILE,
+                                          version=ht_match.HTMatch._SOURCE_FILE_VERSION,
+                                          **ht_match.HTMatch._request_args(match_ht_id, True, match.source),
+                                          )
+            data = response.find("Match")
+            fetched_date = (ht_xml.HTXml.ht_date_from_text(response.find("FetchedDate"))
+                            if response.find("FetchedDate") is not None else None)
+
+            event_list = data.find("EventList")
+            with ht_xml.HTXml.string_table(self._chpp.string_table):
+                events = (ht_xml.HTXml.ht_match_events(event_list, start=match.seen)
+                          if event_list is not None else [])
+
+            state = {"match_date": ht_xml.HTXml.ht_date_from_text(data.find("MatchDate")),
+                     "home_goals": (ht_xml.HTXml.ht_int(data.find("HomeTeam/HomeGoals"))
+                                    if data.find("HomeTeam/HomeGoals") is not None else None),
+                     "away_goals": (ht_xml.HTXml.ht_int(data.find("AwayTeam/AwayGoals"))
+                                    if data.find("AwayTeam/AwayGoals") is not None else None),
+                     "events": match.seen + len(events),
+                     "finished": data.find("FinishedDate") is not None,
+                     }
+
+        except Exception as e:
+            with self._condition:
+                self._reschedule(match_ht_id, match, self.play_interval)
+            if self._on_error is not None:
+                self._on_error(match_ht_id, e)
+            return
+
+        with self._condition:
+            second_half = (match.state is not None and match.state["second_half"]) or any(
+                e["match_part"] >= 2 for e in events)
+            match.seen = state["events"]
+            state["second_half"] = second_half
+            match.state = state
+            subscribers = list(self._subscribers)
+
+            if state["finished"]:
+                self._matches.pop(match_ht_id, None)
+                self._release(match)
+            else:
+                self._reschedule(match_ht_id, match, self._delay(match, fetched_date))
+
+        if events or state["finished"]:
+            for callback in subscribers:
+                callback(match_ht_id, events, dict(state))
+
+    def _reschedule(self, match_ht_id, match, delay):
+        """Must be called with the condition held"""
+        match.due = time.monotonic() + delay
+        heapq.heappush(self._schedule, (match.due, next(self._sequence), match_ht_id))
+        self._release(match)
+
+    def _next(self):
+        """
+        Next match to poll, must be called with the condition held
+
+        :return: (match Hattrick ID, match) tuple, or the delay before next poll
+        """
+        while self._schedule:
+            due, _, match_ht_id = self._schedule[0]
+            match = self._matches.get(match_ht_id)
+
+            # Polls of unfollowed matches, or rescheduled ones, are skipped
+            if match is None or match.due != due or match.in_flight:
+                heapq.heappop(self._schedule)
+                continue
+
+            delay = due - time.monotonic()
+            if delay > 0:
+                return delay
+
+            heapq.heappop(self._schedule)
+            return match_ht_id, match
+
+        return None
+
+    def join(self, timeout=None):
+        """
+        Wait until every followed match is finished
+
+        :param timeout: maximum time to wait, in seconds, defaults to None (no limit)
+        :type timeout: int, float, optional
+        :return: True if every followed match is finished
+        :rtype: bool
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._matches, timeout)
@@ -1,5 +1,5 @@
 from pychpp import ht_model
-from pychpp import ht_team, ht_arena, ht_xml
+from pychpp import ht_arena, ht_match_lineup, ht_concurrency, ht_xml
 
 
 class HTMatch(ht_model.HTModel):
@@ -110,24 +110,107 @@ class HTMatch(ht_model.HTModel):
         elif source not in ("hattrick", "youth", "htointegrated"):
             raise ValueError("source must be equal to 'hattrick, 'youth' or 'htointegrated'")
 
-        self._REQUEST_ARGS = dict()
-        self._REQUEST_ARGS["matchID"] = str(ht_id)
-        self._REQUEST_ARGS["matchEvents"] = "true" if events is True else "false"
-        self._REQUEST_ARGS["sourceSystem"] = source
+        self._REQUEST_ARGS = self._request_args(ht_id, events, source)
+
+        self._source = source
+        self._lineups = None
 
         super().__init__(**kwargs)
 
     def __repr__(self):
         return f"<HTMatch object : {self.home_team_name} - {self.away_team_name} ({self.ht_id})>"
 
+    @staticmethod
+    def _request_args(ht_id, events, source):
+        return {"matchID": str(ht_id),
+                "matchEvents": "true" if events is True else "false",
+                "sourceSystem": source,
+                }
+
     @property
-    def home_team(self):
-        return ht_team.HTTeam(chpp=self._chpp, ht_id=self.home_team_id)
+    def is_finished(self):
+        """Match is finished (Hattrick only sends its finished date once it is over)"""
+        return self.finished_date is not None
+
+    @classmethod
+    def fetch_full(cls, chpp, ht_id, home_team_id=None, away_team_id=None, events=True, source="hattrick"):
+        """
+        Fetch match details and lineups of both teams concurrently
+
+        If home and away teams Hattrick ID are known, details and both lineups
+        are requested at the same time. Otherwise, lineups are requested
+        concurrently once details are fetched.
+
+        :param chpp: CHPP instance of connected user
+        :param ht_id: Hattrick ID of match
+        :param home_team_id: Hattrick ID of home team, if known
+        :param away_team_id: Hattrick ID of away team, if known
+        :param events: define if match events have to be requested
+        :param source: hattrick source to request ('hattrick', 'youth' or 'htointegrated')
+        :type chpp: CHPP
+        :type ht_id: int
+        :type home_team_id: int, optional
+        :type away_team_id: int, optional
+        :type events: bool
+        :type source: str
+        :return: match with lineups already fetched
+        :rtype: HTMatch
+        """
+        if home_team_id is None or away_team_id is None:
+            match = cls(chpp=chpp, ht_id=ht_id, events=events, source=source)
+            match.fetch_lineups()
+            return match
+
+        match, home_lineup, away_lineup = ht_concurrency.bounded_map(
+            lambda fetch: fetch(),
+            [lambda: cls(chpp=chpp, ht_id=ht_id, events=events, source=source),
+             lambda: ht_match_lineup.HTMatchLineup(chpp=chpp, ht_id=ht_id, team_id=home_team_id, source=source),
+             lambda: ht_match_lineup.HTMatchLineup(chpp=chpp, ht_id=ht_id, team_id=away_team_id, source=source),
+             ],
+            max_workers=3,
+        )
+        match._lineups = (home_lineup, away_lineup)
+        return match
+
+    def fetch_lineups(self):
+        """
+        Fetch lineups of home and away teams concurrently
+
+        :return: home team lineup and away team lineup
+        :rtype: tuple of ht_match_lineup.HTMatchLineup
+        """
+        self._lineups = tuple(ht_concurrency.bounded_map(
+            lambda team_id: ht_match_lineup.HTMatchLineup(chpp=self._chpp,
+                                                          ht_id=self.ht_id,
+                                                          team_id=team_id,
+                                                          source=self._source,
+                                                          ),
+            [self.home_team_id, self.away_team_id],
+            max_workers=2,
+        ))
+        return self._lineups
 
     @property
-    def away_team(self):
-        return ht_team.HTTeam(chpp=self._chpp, ht_id=self.away_team_id)
+    def lineups(self):
+        """Home team lineup and away team lineup, fetched on first access"""
+        return self._lineups if self._lineups is not None else self.fetch_lineups()
+
+    @property
+    def home_lineup(self):
+        return self.lineups[0]
 
     @property
+    def away_lineup(self):
+        return self.lineups[1]
+
+    @ht_model.related
+    def home_team(self):
+        return self._chpp.team(ht_id=self.home_team_id)
+
+    @ht_model.related
+    def away_team(self):
+        return self._chpp.team(ht_id=self.away_team_id)
+
+    @ht_model.related
     def arena(self):
         return ht_arena.HTArena(chpp=self._chpp, ht_id=self.arena_id)
@@ -1,5 +1,5 @@
 from pychpp import ht_model
-from pychpp import ht_arena, ht_match, ht_player, ht_team, ht_xml
+from pychpp import ht_arena, ht_concurrency, ht_match, ht_player, ht_xml
 
 
 class HTMatchLineup(ht_model.HTModel):
@@ -61,30 +61,66 @@ class HTMatchLineup(ht_model.HTModel):
         self._REQUEST_ARGS["teamID"] = str(team_id)
         self._REQUEST_ARGS["sourceSystem"] = source
 
+        self._lineup_players = None
+
         super().__init__(**kwargs)
 
     def __repr__(self):
         return f"<HTMatchLineup object : {self.home_team_name} - {self.away_team_name} ({self.ht_id})>"
 
-    @property
+    @ht_model.related
     def home_team(self):
-        return ht_team.HTTeam(chpp=self._chpp, ht_id=self.home_team_id)
+        return self._chpp.team(ht_id=self.home_team_id)
 
-    @property
+    @ht_model.related
     def away_team(self):
-        return ht_team.HTTeam(chpp=self._chpp, ht_id=self.away_team_id)
+        return self._chpp.team(ht_id=self.away_team_id)
 
-    @property
+    @ht_model.related
     def arena(self):
         return ht_arena.HTArena(chpp=self._chpp, ht_id=self.arena_id)
 
-    @property
+    @ht_model.related
     def match(self):
         return ht_match.HTMatch(chpp=self._chpp, ht_id=self.ht_id)
 
+    def _fill_raw_attributes(self):
+        self._lineup_players = self.lineup_players
+
     @property
     def lineup_players(self):
-        return [ht_player.HTLineupPlayer(chpp=self._chpp,
-                                         data=p_data,
-                                         team_ht_id=self.team_id,
-                                         is_youth=self.is_youth) for p_data in self._data.find("Team").find("Lineup").findall("Player")]
+        if self._lineup_players is None:
+            self._lineup_players = [ht_player.HTLineupPlayer(chpp=self._chpp,
+                                                             data=p_data,
+                                                             team_ht_id=self.team_id,
+                                                             is_youth=self.is_youth,
+                                                             keep_raw=self._keep_raw)
+                                    for p_data in self._data.find("Team").find("Lineup").findall("Player")]
+        return self._lineup_players
+
+    def resolve_players(self, max_workers=None):
+        """
+        Fetch full details of every lineup player concurrently
+
+        Each player is requested once, even if it appears several times in the
+        lineup, and is attached to lineup players so that HTLineupPlayer.player
+        does not request it again.
+
+        :param max_workers: maximum number of concurrent requests
+        :type max_workers: int, optional
+        :return: players by Hattrick ID
+        :rtype: dict
+        """
+        lineup_players = dict()
+        for lineup_player in self.lineup_players:
+            lineup_players.setdefault(lineup_player.ht_id, []).append(lineup_player)
+
+        players = dict()
+        for ht_id, player in ht_concurrency.bounded_imap(lambda i: lineup_players[i][0].fetch_player(),
+                                                         lineup_players,
+                                                         max_workers):
+            for lineup_player in lineup_players[ht_id]:
+                lineup_player._player = player
+            players[ht_id] = player
+
+        return players
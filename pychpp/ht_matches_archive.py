@@ -1,7 +1,7 @@
 import datetime
 
 from pychpp import ht_model
-from pychpp import ht_xml
+from pychpp import ht_concurrency, ht_xml
 from pychpp import ht_team, ht_match
 
 
@@ -75,7 +75,14 @@ class HTMatchesArchive(ht_model.HTModel):
 
         super().__init__(**kwargs)
 
-        self.matches_list = [HTMatchesArchiveItem(chpp=self._chpp, data=data)
+    def _fill_ht_attributes(self):
+        super()._fill_ht_attributes()
+        self.matches_list = [HTMatchesArchiveItem(chpp=self._chpp,
+                                                  data=data,
+                                                  source=("youth" if self._REQUEST_ARGS["isYouth"] == "true"
+                                                          else "hattrick"),
+                                                  keep_raw=self._keep_raw,
+                                                  )
                              for data in self._data.findall("Team/MatchList/Match")]
 
     def __getitem__(self, item):
@@ -97,6 +104,128 @@ class HTMatchesArchive(ht_model.HTModel):
         
         return f'{self._BASE_URL}{self._URL_PATH}{"%26".join(url_args)}'
 
+    def hydrate(self, match_filter=None, events=False, max_workers=None, cache=None):
+        """
+        Fetch details of archived matches concurrently
+
+        Fetched details are attached to archive items, so that
+        HTMatchesArchiveItem.details does not request them again.
+
+        :param match_filter: function called with each HTMatchesArchiveItem,
+                             items for which it returns False are not hydrated, defaults to None (all items)
+        :param events: define if match events have to be requested
+        :param max_workers: maximum number of concurrent requests
+        :param cache: mapping of match Hattrick ID to HTMatch, finished matches found in it
+                      are not requested again and fetched matches are stored in it
+        :type match_filter: callable, optional
+        :type events: bool
+        :type max_workers: int, optional
+        :type cache: dict, optional
+        :return: details of hydrated items, in archive order
+        :rtype: list of ht_match.HTMatch
+        """
+        if not isinstance(events, bool):
+            raise ValueError("events must be a boolean")
+
+        items = [i for i in self.matches_list if match_filter is None or match_filter(i)]
+
+        def is_cached(item):
+            match = cache.get(item.ht_id) if cache is not None else None
+            return (match is not None and match.is_finished
+                    and (events is False or match.events is not None))
+
+        to_fetch = list()
+        for item in items:
+            if is_cached(item):
+                item._details = cache[item.ht_id]
+            else:
+                to_fetch.append(item)
+
+        for item, match in ht_concurrency.bounded_imap(lambda i: i.fetch_details(events=events),
+                                                       to_fetch,
+                                                       max_workers):
+            if cache is not None:
+                cache[item.ht_id] = match
+
+        return [item.details for item in items]
+
+    @classmethod
+    def iter_history(cls, chpp, ht_id=None, youth=False, hto=False, seasons=None,
+                     first_match_date=None, last_match_date=None,
+                     window=datetime.timedelta(days=112), max_workers=None):
+        """
+        Iterate over the whole matches history of a team
+
+        History is fetched by seasons if seasons are given, else by date windows
+        between first_match_date (team creation date if not set) and
+        last_match_date (now if not set). Seasons or windows are fetched
+        concurrently and matches are yielded as soon as their season or window
+        is fetched, so they are not sorted by date. Only max_workers archives are
+        held in memory at a time.
+
+        :param chpp: CHPP instance of connected user
+        :param ht_id: Hattrick ID of team (if none, primary team of connected user)
+        :param youth: define if requested team is youth or not
+        :param hto: including or not tounaments matches
+        :param seasons: seasons to walk
+        :param first_match_date: begin date of history, ignored if seasons are given
+        :param last_match_date: end date of history, ignored if seasons are given
+        :param window: length of date windows, defaults to a season (16 weeks)
+        :param max_workers: maximum number of concurrent requests
+        :type chpp: CHPP
+        :type ht_id: int
+        :type youth: bool
+        :type hto: bool
+        :type seasons: iterable of int, optional
+        :type first_match_date: datetime.datetime, optional
+        :type last_match_date: datetime.datetime, optional
+        :type window: datetime.timedelta
+        :type max_workers: int, optional
+        :return: generator of HTMatchesArchiveItem
+        :rtype: generator
+        """
+        if not isinstance(window, datetime.timedelta) or window < datetime.timedelta(seconds=1):
+            raise ValueError("window must be a datetime.timedelta of at least one second")
+
+        if seasons is not None:
+            periods = ({"season": season} for season in seasons)
+            edges = set()
+
+        else:
+            if first_match_date is None:
+                first_match_date = (ht_team.HTYouthTeam(chpp=chpp, ht_id=ht_id).created_date if youth
+                                    else chpp.team(ht_id=ht_id).founded_date)
+            if last_match_date is None:
+                last_match_date = datetime.datetime.now()
+
+            # Windows do not overlap, as dates sent to Hattrick are precise to the second
+            def windows():
+                start = first_match_date
+                while start <= last_match_date:
+                    end = min(start + window - datetime.timedelta(seconds=1), last_match_date)
+                    yield {"first_match_date": start, "last_match_date": end}
+                    start = end + datetime.timedelta(seconds=1)
+
+            periods = windows()
+            edges = None
+
+        def fetch(period):
+            return cls(chpp=chpp, ht_id=ht_id, youth=youth, hto=hto, **period).matches_list
+
+        # Only matches played on a window edge could be returned twice,
+        # so only their IDs are kept to deduplicate results
+        edge_matches_ht_id = set()
+
+        for period, matches in ht_concurrency.bounded_imap(fetch, periods, max_workers):
+            period_edges = (edges if edges is not None
+                            else {period["first_match_date"], period["last_match_date"]})
+            for match in matches:
+                if match.date in period_edges:
+                    if match.ht_id in edge_matches_ht_id:
+                        continue
+                    edge_matches_ht_id.add(match.ht_id)
+                yield match
+
 
 class HTMatchesArchiveItem(ht_model.HTModel):
     """
@@ -120,17 +249,44 @@ class HTMatchesArchiveItem(ht_model.HTModel):
                       ("away_goals", "AwayGoals", ht_xml.HTXml.ht_int,),
                       ]
 
+    def __init__(self, source="hattrick", **kwargs):
+        """
+        Initialize HTMatchesArchiveItem instance
+
+        :param source: hattrick source of match ('hattrick', 'youth' or 'htointegrated')
+        :key chpp: CHPP instance of connected user
+        :key data: ElementTree data to serialize
+        :type source: str
+        :type chpp: CHPP
+        :type data: xml.ElementTree.Element
+        """
+        self._source = source
+        self._details = None
+        super().__init__(**kwargs)
+
     def __repr__(self):
         return f"<{self.__class__.__name__} object : {self.home_team_name} - {self.away_team_name} ({self.ht_id})>"
 
+    def fetch_details(self, events=False):
+        """
+        Fetch match details and keep them as details of this item
+
+        :param events: define if match events have to be requested
+        :type events: bool
+        :rtype: ht_match.HTMatch
+        """
+        self._details = ht_match.HTMatch(chpp=self._chpp, ht_id=self.ht_id, events=events, source=self._source)
+        return self._details
+
     @property
     def details(self):
-        return ht_match.HTMatch(chpp=self._chpp, ht_id=self.ht_id)
+        """Match details, fetched on first access"""
+        return self._details if self._details is not None else self.fetch_details()
 
-    @property
+    @ht_model.related
     def home_team(self):
-        return ht_team.HTTeam(chpp=self._chpp, ht_id=self.home_team_id)
+        return self._chpp.team(ht_id=self.home_team_id)
 
-    @property
+    @ht_model.related
     def away_team(self):
-        return ht_team.HTTeam(chpp=self._chpp, ht_id=self.away_team_id)
+        return self._chpp.team(ht_id=self.away_team_id)
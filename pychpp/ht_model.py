@@ -1,5 +1,28 @@
+import functools
 import xml.etree.ElementTree
 from pychpp import chpp as _chpp
+from pychpp import ht_concurrency, ht_xml
+
+
+def related(fget):
+    """
+    Declare a property returning data related to a model
+
+    Related data are usually fetched on Hattrick when the property is
+    accessed. They can also be fetched in advance with HTModel.prefetch,
+    in which case the property returns them without any new request.
+    """
+    name = fget.__name__
+
+    @functools.wraps(fget)
+    def getter(self):
+        try:
+            return self._related[name]
+        except KeyError:
+            return fget(self)
+
+    getter._ht_related = fget
+    return property(getter)
 
 
 class HTModel:
@@ -16,33 +39,73 @@ class HTModel:
 
     _ht_attributes = list()
 
-    def __init__(self, chpp, data=None):
+    def __init__(self, chpp, data=None, prefetch=None, keep_raw=None, use_negative_cache=True):
 
         if not isinstance(chpp, _chpp.CHPP):
             raise ValueError("chpp must be a CHPP instance")
         elif not isinstance(data, xml.etree.ElementTree.Element) and data is not None:
             raise ValueError("data must be an xml.etree.ElementTree.Element instance")
+        elif not isinstance(keep_raw, bool) and keep_raw is not None:
+            raise ValueError("keep_raw must be None or a boolean")
+        elif not isinstance(use_negative_cache, bool):
+            raise ValueError("use_negative_cache must be a boolean")
 
         self._chpp = chpp
         self._data = data
+        self._keep_raw = keep_raw if keep_raw is not None else chpp.keep_raw
+        self._use_negative_cache = use_negative_cache
+
+        # Values of related properties, fetched in advance
+        self._related = dict()
 
         # If data is not given, fetch data on Hattrick
         if self._data is None:
             self._fetch()
 
-        self._fill_ht_attributes()
+        with ht_xml.HTXml.string_table(self._chpp.string_table):
+            self._fill_ht_attributes()
+
+        if prefetch:
+            self.prefetch(*prefetch)
 
+        # Once parsed, raw xml data are only kept if required
+        if not self._keep_raw:
+            self._drop_raw()
 
     def __repr__(self):
         return f"<{self.__class__.__name__} object>"
 
+    def __getstate__(self):
+        # Only parsed attributes are pickled, CHPP instance is pickled as
+        # its credentials (see CHPP.credentials)
+        if self._data is not None:
+            self._fill_raw_attributes()
+        state = self.__dict__.copy()
+        state["_data"] = None
+        state["_keep_raw"] = False
+        return state
+
     def _fetch(self):
 
         self._data = self._chpp.request(file=self._SOURCE_FILE,
                                         version=self._SOURCE_FILE_VERSION,
+                                        use_negative_cache=self._use_negative_cache,
                                         **self._REQUEST_ARGS,
                                         )
 
+    def _fill_raw_attributes(self):
+        """
+        Set attributes which are otherwise read from raw xml data when
+        accessed, called only before these data are dropped
+        """
+        pass
+
+    def _drop_raw(self):
+        """Drop raw xml data, once attributes read from them are set"""
+        self._fill_raw_attributes()
+        self._keep_raw = False
+        self._data = None
+
     def _fill_ht_attributes(self):
         # Set attributes according to self._ht_attributes list
         for attr_tuple in self._ht_attributes:
@@ -53,6 +116,55 @@ class HTModel:
                      else None),
                     )
 
+    @classmethod
+    def prefetchable(cls):
+        """
+        Names of related properties which can be prefetched
+
+        :rtype: list of str
+        """
+        return [name for name in dir(cls)
+                if isinstance(getattr(cls, name, None), property)
+                and hasattr(getattr(cls, name).fget, "_ht_related")]
+
+    def prefetch(self, *names, max_workers=None):
+        """
+        Fetch related data concurrently
+
+        Once fetched, related properties return them without any new request.
+
+        :param names: names of related properties to fetch, e.g. "players" or "arena"
+        :param max_workers: maximum number of concurrent requests
+        :type names: str
+        :type max_workers: int, optional
+        :return: current instance
+        """
+        prefetchable = self.prefetchable()
+        for name in names:
+            if name not in prefetchable:
+                raise ValueError(f"{name} can't be prefetched for {self.__class__.__name__}, "
+                                 f"prefetchable data are {', '.join(prefetchable)}")
+
+        values = ht_concurrency.bounded_map(lambda n: getattr(type(self), n).fget._ht_related(self),
+                                            names,
+                                            max_workers)
+        self._related.update(zip(names, values))
+
+        return self
+
+    def invalidate(self, *names):
+        """
+        Forget cached related data, so that they are fetched again on next access
+
+        :param names: names of related properties to forget, defaults to all of them
+        :type names: str
+        """
+        if names:
+            for name in names:
+                self._related.pop(name, None)
+        else:
+            self._related.clear()
+
     @property
     def url(self):
         return f"{self._BASE_URL}{self._URL_PATH}{self.ht_id}" if getattr(
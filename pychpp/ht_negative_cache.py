@@ -0,0 +1,123 @@
+import collections
+import threading
+import time
+
+from pychpp import ht_error
+
+# Errors meaning that the requested entity does not exist
+UNKNOWN_ID_ERRORS = (ht_error.HTUnknownMatchIdError,
+                     ht_error.HTUnknownTeamIdError,
+                     ht_error.HTUnknownYouthTeamIdError,
+                     ht_error.HTUnknownPlayerIdError,
+                     ht_error.HTUnknownYouthPlayerIdError,
+                     )
+
+
+class HTNegativeCache:
+    """
+    Errors returned by Hattrick for unknown IDs, by file and parameters
+
+    Errors are forgotten after ttl seconds, and the least recently used
+    error is forgotten when max_size is reached. It can be shared between
+    threads.
+    """
+
+    def __init__(self, max_size=4096, ttl=3600.0):
+        """
+        Initialize a HTNegativeCache instance
+
+        :param max_size: maximum number of kept errors, 0 to keep none
+        :param ttl: time during which an error is kept, in seconds
+        :type max_size: int
+        :type ttl: int, float
+        """
+        if not isinstance(max_size, int) or max_size < 0:
+            raise ValueError("max_size must be an integer greater than or equal to 0")
+        elif not isinstance(ttl, (int, float)) or type(ttl) == bool or ttl <= 0:
+            raise ValueError("ttl must be a positive number")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self._errors = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._errors)
+
+    @staticmethod
+    def key(kwargs):
+        """
+        Key of a request, made of its file and parameters
+
+        Every parameter but version is part of the key, as parameters such
+        as sourceSystem or isYouth define which entities IDs refer to.
+
+        :param kwargs: parameters of the request
+        :type kwargs: dict
+        :return: key, or None if the request has no ID parameter
+        :rtype: tuple
+        """
+        params = tuple(sorted((k.lower(), str(v)) for k, v in kwargs.items()
+                              if k not in ("file", "version") and not k.startswith("oauth_")
+                              and v not in ("", None)))
+        if not any(k.endswith("id") for k, _ in params):
+            return None
+        return kwargs.get("file"), params
+
+    def get(self, key):
+        """
+        Get the error returned for a request
+
+        :param key: key of the request
+        :type key: tuple
+        :return: new instance of the error, or None if it is not known or expired
+        :rtype: ht_error.HTError
+        """
+        with self._lock:
+            item = self._errors.get(key)
+            if item is None:
+                return None
+            elif item[0] <= time.monotonic():
+                del self._errors[key]
+                return None
+            self._errors.move_to_end(key)
+
+        cls, args = item[1]
+        return cls(*args)
+
+    def add(self, key, error):
+        """
+        Keep the error returned for a request
+
+        :param key: key of the request
+        :param error: raised error
+        :type key: tuple
+        :type error: ht_error.HTError
+        """
+        if self.max_size == 0:
+            return
+
+        with self._lock:
+            # Error class and arguments are kept, not the raised instance
+            # and its traceback
+            self._errors[key] = (time.monotonic() + self.ttl, (type(error), error.args))
+            self._errors.move_to_end(key)
+            while len(self._errors) > self.max_size:
+                self._errors.popitem(last=False)
+
+    def discard(self, key):
+        """
+        Forget the error returned for a request, if it is known
+
+        :param key: key of the request
+        :type key: tuple
+        """
+        with self._lock:
+            self._errors.pop(key, None)
+
+    def clear(self):
+        """
+        Forget every error
+        """
+        with self._lock:
+            self._errors.clear()
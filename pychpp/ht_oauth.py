@@ -0,0 +1,129 @@
+import base64
+import hashlib
+import hmac
+import os
+import time
+import urllib.parse
+
+
+class HTOAuthSigner:
+    """
+    Sign CHPP requests with OAuth 1.0 HMAC-SHA1
+
+    Signatures are the same as the ones computed by rauth for a GET request
+    with query parameters, but the signing key and the escaped request prefix
+    are computed once instead of on every request.
+    """
+
+    SIGNATURE_METHOD = "HMAC-SHA1"
+    VERSION = "1.0"
+
+    def __init__(self, consumer_key, consumer_secret, access_token_key="", access_token_secret=""):
+        """
+        Initialization of a HTOAuthSigner instance
+
+        :param consumer_key: Consumer Key of the application
+        :param consumer_secret: Consumer Secret of the application
+        :param access_token_key: Access Token Key for the current user
+        :param access_token_secret: Access Token Secret for the current user
+        :type consumer_key: str
+        :type consumer_secret: str
+        :type access_token_key: str
+        :type access_token_secret: str
+        """
+        self.consumer_key = consumer_key
+        self.access_token_key = access_token_key
+
+        self._key = self._escape(consumer_secret) + b"&"
+        if access_token_secret is not None:
+            self._key += self._escape(access_token_secret)
+
+        # Escaped "METHOD&URL&" prefixes of signature base strings
+        self._prefixes = dict()
+
+    @staticmethod
+    def _escape(value):
+        """
+        Percent-encode a value as required by OAuth 1.0 (RFC 5849, 3.6)
+
+        :param value: value to escape
+        :type value: str, bytes
+        :rtype: bytes
+        """
+        if not isinstance(value, bytes):
+            value = value.encode("utf-8")
+        return urllib.parse.quote(value, safe="~").encode("utf-8")
+
+    @staticmethod
+    def _normalize_parameters(params):
+        """
+        Sort and encode request parameters (RFC 5849, 3.4.1.3.2)
+
+        List and tuple values are expanded into one pair by item, in their
+        order, as they are sent in the query string.
+
+        :param params: request and OAuth parameters, None values are ignored
+        :type params: dict
+        :rtype: str
+        """
+        return "&".join(
+            f"{urllib.parse.quote(k, safe='~')}="
+            f"{urllib.parse.quote(v if isinstance(v, (str, bytes)) else str(v), safe='~')}"
+            for k, values in sorted(params.items()) if values is not None
+            for v in (values if isinstance(values, (list, tuple)) else [values]))
+
+    def _prefix(self, method, url):
+        prefix = self._prefixes.get((method, url))
+        if prefix is None:
+            # Query string is not part of the signed url
+            scheme, netloc, path, _, fragment = urllib.parse.urlsplit(url)
+            base_url = urllib.parse.urlunsplit((scheme, netloc, path, "", fragment))
+            prefix = self._escape(method) + b"&" + self._escape(base_url) + b"&"
+            self._prefixes[(method, url)] = prefix
+        return prefix
+
+    def signature(self, method, url, params):
+        """
+        Compute the signature of a request
+
+        :param method: HTTP method of the request
+        :param url: url of the request
+        :param params: request parameters, including OAuth ones
+        :type method: str
+        :type url: str
+        :type params: dict
+        :return: base64 encoded signature
+        :rtype: str
+        """
+        base_string = self._prefix(method, url) + self._escape(self._normalize_parameters(params))
+        return base64.b64encode(hmac.new(self._key, base_string, hashlib.sha1).digest()).decode()
+
+    def sign(self, method, url, params, nonce=None, timestamp=None):
+        """
+        Add OAuth parameters and signature to request parameters
+
+        :param method: HTTP method of the request
+        :param url: url of the request
+        :param params: request parameters
+        :param nonce: OAuth nonce, randomly generated if not set
+        :param timestamp: OAuth timestamp, current time if not set
+        :type method: str
+        :type url: str
+        :type params: dict
+        :type nonce: str, optional
+        :type timestamp: int, optional
+        :return: a new dictionary with request and OAuth parameters
+        :rtype: dict
+        """
+        signed_params = dict(params)
+        signed_params["oauth_consumer_key"] = self.consumer_key
+        signed_params["oauth_nonce"] = nonce if nonce is not None else hashlib.sha1(os.urandom(20)).hexdigest()
+        signed_params["oauth_signature_method"] = self.SIGNATURE_METHOD
+        signed_params["oauth_timestamp"] = timestamp if timestamp is not None else int(time.time())
+        if self.access_token_key is not None:
+            signed_params["oauth_token"] = self.access_token_key
+        signed_params["oauth_version"] = self.VERSION
+
+        signed_params["oauth_signature"] = self.signature(method, url, signed_params)
+
+        return signed_params
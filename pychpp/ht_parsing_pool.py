@@ -0,0 +1,157 @@
+import concurrent.futures
+import multiprocessing
+import os
+import sys
+
+from pychpp import chpp as _chpp
+from pychpp import ht_concurrency, ht_credentials, ht_match, ht_model
+
+
+def _parse(credentials, settings, cls, text, model_kwargs):
+    """Build a model from a xml document, in a worker process"""
+    chpp = ht_credentials._connect(credentials, settings)
+    return cls(chpp=chpp, data=chpp.parse_response(text), keep_raw=False, **model_kwargs)
+
+
+def _mp_context():
+    """Multiprocessing context of worker processes, which are not forked"""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _interned(table, value, seen):
+    """Value with its strings interned in a string table, in nested containers and models too"""
+    if isinstance(value, str):
+        return table.intern(value)
+    elif isinstance(value, tuple):
+        return tuple(_interned(table, v, seen) for v in value)
+    elif isinstance(value, (list, dict, ht_model.HTModel)) and id(value) not in seen:
+        seen.add(id(value))
+        if isinstance(value, list):
+            value[:] = [_interned(table, v, seen) for v in value]
+        elif isinstance(value, dict):
+            for k, v in value.items():
+                value[k] = _interned(table, v, seen)
+        else:
+            for k, v in vars(value).items():
+                if k != "_chpp":
+                    vars(value)[k] = _interned(table, v, seen)
+    return value
+
+
+class HTParsingPool:
+    """
+    Fetch documents in threads and parse them in worker processes
+
+    Requests are sent by a thread pool, through the negative cache and the
+    circuit breaker of chpp (see CHPP.request_text), then raw xml documents
+    are sent to a process pool, where they are parsed into models. Models are sent back
+    without their raw xml data (see HTModel pickling), so that parsing
+    scales with the number of cores instead of being serialized by the GIL.
+
+    Strings of models are interned in the string table of chpp, if any,
+    once models are sent back, as workers don't share it.
+
+    Worker processes are started with the forkserver method, or the spawn
+    one where it is not available, as forking while fetch threads are
+    running could copy locks held by them. As with multiprocessing, the
+    main module must be importable without side effects.
+    """
+
+    def __init__(self, chpp, processes=None, max_workers=None):
+        """
+        Initialize a HTParsingPool instance
+
+        :param chpp: CHPP instance of connected user
+        :param processes: number of worker processes, defaults to the number of processors
+        :param max_workers: maximum number of concurrent requests
+        :type chpp: CHPP
+        :type processes: int, optional
+        :type max_workers: int, optional
+        """
+        if not isinstance(chpp, _chpp.CHPP):
+            raise ValueError("chpp must be a CHPP instance")
+        elif processes is not None and (not isinstance(processes, int) or processes < 1):
+            raise ValueError("processes must be a positive integer")
+
+        self._chpp = chpp
+        self._processes = processes
+        self._max_workers = ht_concurrency.resolve_max_workers(max_workers)
+
+        # Models sent back by workers are attached to chpp
+        ht_credentials._register(chpp)
+
+    def parse(self, cls, items):
+        """
+        Fetch and parse models
+
+        :param cls: class of models, must be a ht_model.HTModel subclass
+        :param items: request arguments and model arguments of each model
+        :type cls: type
+        :type items: iterable of (dict, dict) tuples
+        :return: models, in completion order
+        :rtype: generator
+        """
+        credentials = self._chpp.credentials
+        settings = self._chpp._settings()
+
+        def fetch(item):
+            return self._chpp.request_text(file=cls._SOURCE_FILE,
+                                           version=cls._SOURCE_FILE_VERSION,
+                                           **item[0])
+
+        processes = self._processes or os.cpu_count() or 1
+        # Parsing is bounded too, so that documents don't pile up in memory
+        max_pending = 2 * processes
+
+        # Python 3.6 doesn't allow to choose the start method of a process pool
+        if sys.version_info >= (3, 7):
+            executor_kwargs = {"mp_context": _mp_context()}
+        else:
+            executor_kwargs = dict()
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes, **executor_kwargs) as executor:
+            pending = set()
+
+            try:
+                for (_, model_kwargs), text in ht_concurrency.bounded_imap(fetch, items, self._max_workers):
+                    pending.add(executor.submit(_parse, credentials, settings, cls, text, model_kwargs))
+
+                    while len(pending) >= max_pending:
+                        done, pending = concurrent.futures.wait(pending,
+                                                                return_when=concurrent.futures.FIRST_COMPLETED)
+                        for future in done:
+                            yield self._result(future)
+
+                for future in concurrent.futures.as_completed(pending):
+                    yield self._result(future)
+
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _result(self, future):
+        """Model built by a worker, with its strings interned in the string table of chpp"""
+        model = future.result()
+        if self._chpp.string_table is not None:
+            _interned(self._chpp.string_table, model, set())
+        return model
+
+    def matches(self, ht_ids, events=True, source="hattrick"):
+        """
+        Fetch and parse matches
+
+        :param ht_ids: Hattrick ID of matches
+        :param events: define if match events have to be requested
+        :param source: hattrick source to request ('hattrick', 'youth' or 'htointegrated')
+        :type ht_ids: iterable of int
+        :type events: bool
+        :type source: str
+        :return: matches, in completion order
+        :rtype: generator of ht_match.HTMatch
+        """
+        return self.parse(ht_match.HTMatch,
+                          ((ht_match.HTMatch._request_args(ht_id, events, source),
+                            {"ht_id": ht_id, "events": events, "source": source})
+                           for ht_id in ht_ids))
@@ -1,5 +1,4 @@
 from pychpp import ht_model, ht_xml
-from pychpp import ht_team
 
 
 class HTCorePlayer(ht_model.HTModel):
@@ -134,9 +133,9 @@ class HTPlayer(HTCorePlayer):
             self._REQUEST_ARGS["playerID"] = kwargs["ht_id"]
         super().__init__(**kwargs)
 
-    @property
+    @ht_model.related
     def team(self):
-        return ht_team.HTTeam(chpp=self._chpp, ht_id=self.team_ht_id)
+        return self._chpp.team(ht_id=self.team_ht_id)
 
 
 class HTYouthPlayer(HTCorePlayer):
@@ -228,6 +227,7 @@ class HTLineupPlayer(HTCorePlayer):
         :type data: xml.ElementTree.Element, optional
         :type team_ht_id: int, optional
         """
+        self._player = None
         super().__init__(**kwargs)
         self.is_youth = is_youth
 
@@ -260,10 +260,22 @@ class HTLineupPlayer(HTCorePlayer):
                       32: 'Penalty taker (11)'}
         return role_names.get(self.role_id, "Unknown role")
 
+    def fetch_player(self):
+        """
+        Fetch full player details and keep them as player of this lineup player
+
+        :rtype: HTPlayer or HTYouthPlayer
+        """
+        self._player = (HTYouthPlayer(chpp=self._chpp, ht_id=self.ht_id) if self.is_youth
+                        else HTPlayer(chpp=self._chpp, ht_id=self.ht_id))
+        return self._player
+
     @property
     def player(self):
-        return HTYouthPlayer(chpp=self._chpp, ht_id=self.ht_id) if self.is_youth else HTPlayer(chpp=self._chpp, ht_id=self.ht_id)
+        """Full player details, fetched on first access"""
+        return self._player if self._player is not None else self.fetch_player()
 
     @property
     def url(self):
-        return self.player.url
+        url_path = HTYouthPlayer._URL_PATH if self.is_youth else HTPlayer._URL_PATH
+        return f"{self._BASE_URL}{url_path}{self.ht_id}"
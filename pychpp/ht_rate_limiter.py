@@ -0,0 +1,55 @@
+import threading
+import time
+
+
+class HTRateLimiter:
+    """
+    Spread requests evenly under a rate budget
+
+    Each call to acquire() reserves the next free time slot, slots being
+    spaced by 1 / rate seconds, and waits until this slot. It can be shared
+    between threads.
+    """
+
+    def __init__(self, rate):
+        """
+        Initialize a HTRateLimiter instance
+
+        :param rate: maximum number of requests per second
+        :type rate: int, float
+        """
+        if not isinstance(rate, (int, float)) or type(rate) == bool or rate <= 0:
+            raise ValueError("rate must be a positive number")
+
+        self.rate = rate
+        self._interval = 1.0 / rate
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def delay(self):
+        """
+        Time to wait before the next free slot
+
+        :return: delay in seconds
+        :rtype: float
+        """
+        with self._lock:
+            return max(self._next_slot - time.monotonic(), 0.0)
+
+    def acquire(self):
+        """
+        Wait until a request can be sent
+
+        :return: time waited, in seconds
+        :rtype: float
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self._interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+        return delay
@@ -0,0 +1,330 @@
+import concurrent.futures
+import datetime
+import threading
+import time
+
+from pychpp import chpp as _chpp
+from pychpp import ht_challenge, ht_concurrency, ht_league, ht_rate_limiter, ht_team
+
+
+class _HTTrackedEntity:
+    """Entity kept up to date by a HTRefreshScheduler"""
+
+    def __init__(self, fetch, max_age, priority):
+        self.fetch = fetch
+        self.max_age = max_age
+        self.priority = priority
+        self.value = None
+        self.fetched_at = None
+        self.due = time.monotonic()
+        self.in_flight = False
+
+
+class _HTScheduler:
+    """
+    Process due items in a thread pool, from a background scheduling thread
+
+    Subclasses choose the next item to process (_next), process it in a
+    worker thread (_process), and release it once processed (_release).
+    Items must have an in_flight attribute, set while they are processed.
+    """
+
+    def __init__(self, chpp, rate=None, max_workers=None, on_error=None):
+        """
+        Initialize a _HTScheduler instance
+
+        :param chpp: CHPP instance of connected user
+        :param rate: maximum number of requests per second, defaults to None (no limit)
+        :param max_workers: maximum number of items processed concurrently
+        :param on_error: function called when processing an item fails
+        :type chpp: CHPP
+        :type rate: int, float, optional
+        :type max_workers: int, optional
+        :type on_error: callable, optional
+        """
+        if not isinstance(chpp, _chpp.CHPP):
+            raise ValueError("chpp must be a CHPP instance")
+        elif on_error is not None and not callable(on_error):
+            raise ValueError("on_error must be callable")
+
+        self._chpp = chpp
+        self._rate_limiter = ht_rate_limiter.HTRateLimiter(rate) if rate is not None else None
+        self._max_workers = ht_concurrency.resolve_max_workers(max_workers)
+        self._on_error = on_error
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._thread = None
+        self._stopping = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _next(self):
+        """
+        Next item to process, must be called with the condition held
+
+        :return: (key, item) tuple, or the delay before the next due item,
+                 or None if no item is due
+        """
+        raise NotImplementedError
+
+    def _process(self, key, item):
+        """Process an item, in a worker thread, then release it (see _release)"""
+        raise NotImplementedError
+
+    def _release(self, item):
+        """Must be called with the condition held, once an item is processed"""
+        item.in_flight = False
+        self._in_flight -= 1
+        self._condition.notify_all()
+
+    def _run(self):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            while True:
+                with self._condition:
+                    while True:
+                        if self._stopping:
+                            return
+                        item = self._next() if self._in_flight < self._max_workers else None
+                        if isinstance(item, tuple):
+                            break
+                        self._condition.wait(item)
+
+                    key, item = item
+                    item.in_flight = True
+                    self._in_flight += 1
+
+                # Rate budget is spent by the scheduling thread only
+                if self._rate_limiter is not None:
+                    self._rate_limiter.acquire()
+
+                executor.submit(self._process, key, item)
+
+    def start(self):
+        """
+        Start processing items in background threads
+        """
+        with self._condition:
+            if self._thread is not None:
+                raise RuntimeError(f"{self.__class__.__name__} is already started")
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name=self.__class__.__name__, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stop processing items, and wait for items in progress
+        """
+        with self._condition:
+            if self._thread is None:
+                return
+            self._stopping = True
+            self._condition.notify_all()
+
+        self._thread.join()
+        self._thread = None
+
+
+class HTRefreshScheduler(_HTScheduler):
+    """
+    Keep tracked entities up to date in background threads
+
+    Each entity is registered with a maximum age. Once started, the scheduler
+    fetches every entity older than its maximum age, most important and most
+    outdated entities first, under a global rate budget. Consumers read
+    entities from the scheduler store instead of requesting Hattrick, so that
+    an entity tracked by several consumers is fetched only once.
+    """
+
+    # Delay before fetching again an entity whose last fetch failed, in seconds
+    RETRY_DELAY = 60.0
+
+    def __init__(self, chpp, rate=None, max_workers=None, on_update=None, on_error=None):
+        """
+        Initialize a HTRefreshScheduler instance
+
+        :param chpp: CHPP instance of connected user
+        :param rate: maximum number of requests per second, defaults to None (no limit)
+        :param max_workers: maximum number of concurrent fetches
+        :param on_update: function called with key and new value of an entity each time it is fetched,
+                          from a worker thread
+        :param on_error: function called with key and raised exception when a fetch fails,
+                         from a worker thread
+        :type chpp: CHPP
+        :type rate: int, float, optional
+        :type max_workers: int, optional
+        :type on_update: callable, optional
+        :type on_error: callable, optional
+        """
+        super().__init__(chpp, rate=rate, max_workers=max_workers, on_error=on_error)
+
+        if on_update is not None and not callable(on_update):
+            raise ValueError("on_update must be callable")
+
+        self._on_update = on_update
+        self._entities = dict()
+
+    def track(self, key, fetch, max_age, priority=0):
+        """
+        Track an entity
+
+        If the entity is already tracked, the smallest maximum age and the
+        highest priority are kept.
+
+        :param key: key of the entity in the store
+        :param fetch: function called without argument to fetch the entity
+        :param max_age: maximum age of the entity, in seconds
+        :param priority: entities with higher priority are fetched first
+        :type key: hashable
+        :type fetch: callable
+        :type max_age: int, float, datetime.timedelta
+        :type priority: int
+        :return: key of the entity
+        """
+        if not callable(fetch):
+            raise ValueError("fetch must be callable")
+
+        if isinstance(max_age, datetime.timedelta):
+            max_age = max_age.total_seconds()
+        if not isinstance(max_age, (int, float)) or type(max_age) == bool or max_age <= 0:
+            raise ValueError("max_age must be a positive number or a datetime.timedelta instance")
+
+        with self._condition:
+            entity = self._entities.get(key)
+            if entity is None:
+                self._entities[key] = _HTTrackedEntity(fetch, max_age, priority)
+            else:
+                entity.max_age = min(entity.max_age, max_age)
+                entity.priority = max(entity.priority, priority)
+                if entity.fetched_at is not None:
+                    entity.due = min(entity.due, entity.fetched_at + entity.max_age)
+            self._condition.notify()
+
+        return key
+
+    def track_team(self, ht_id, max_age, priority=0):
+        """
+        Track a team, stored as ("team", ht_id)
+
+        :rtype: tuple
+        """
+        def fetch():
+            team = ht_team.HTTeam(chpp=self._chpp, ht_id=ht_id)
+            # Fresh team replaces the one returned by chpp.team
+            self._chpp.identity_map.add(team)
+            return team
+
+        return self.track(("team", ht_id), fetch, max_age, priority)
+
+    def track_players(self, team_ht_id, max_age, priority=0):
+        """
+        Track players list of a team, stored as ("players", team_ht_id)
+
+        :rtype: tuple
+        """
+        return self.track(("players", team_ht_id),
+                          lambda: self._chpp.team(ht_id=team_ht_id).fetch_players(),
+                          max_age, priority)
+
+    def track_league(self, ht_id, max_age, priority=0):
+        """
+        Track a league table, stored as ("league", ht_id)
+
+        :rtype: tuple
+        """
+        return self.track(("league", ht_id),
+                          lambda: ht_league.HTLeague(chpp=self._chpp, ht_id=ht_id),
+                          max_age, priority)
+
+    def track_challenges(self, team_ht_id, max_age, priority=0):
+        """
+        Track challenges of a team of connected user, stored as ("challenges", team_ht_id)
+
+        :rtype: tuple
+        """
+        return self.track(("challenges", team_ht_id),
+                          lambda: ht_challenge.HTChallengeManager(chpp=self._chpp, team_ht_id=team_ht_id).list(),
+                          max_age, priority)
+
+    def untrack(self, key):
+        """
+        Stop tracking an entity, and remove it from the store
+
+        :param key: key of the entity
+        """
+        with self._condition:
+            self._entities.pop(key, None)
+
+    def get(self, key, default=None):
+        """
+        Last fetched value of an entity
+
+        :param key: key of the entity
+        :param default: value returned if the entity is not fetched yet
+        """
+        with self._condition:
+            entity = self._entities.get(key)
+            return entity.value if entity is not None and entity.fetched_at is not None else default
+
+    def age(self, key):
+        """
+        Age of the last fetched value of an entity
+
+        :param key: key of the entity
+        :return: age in seconds, or None if the entity is not fetched yet
+        :rtype: float
+        """
+        with self._condition:
+            entity = self._entities.get(key)
+            if entity is None or entity.fetched_at is None:
+                return None
+            return time.monotonic() - entity.fetched_at
+
+    def refresh(self, key):
+        """
+        Fetch an entity as soon as possible
+
+        :param key: key of the entity
+        """
+        with self._condition:
+            self._entities[key].due = time.monotonic()
+            self._condition.notify()
+
+    def _next(self):
+        """
+        Next entity to fetch, most important and most outdated first
+
+        Must be called with the condition held.
+
+        :return: (key, entity) tuple, or the delay before the next due entity
+        """
+        now = time.monotonic()
+        due = [(k, e) for k, e in self._entities.items() if not e.in_flight and e.due <= now]
+        if due:
+            return max(due, key=lambda i: (i[1].priority, (now - i[1].due) / i[1].max_age))
+
+        return min([e.due - now for e in self._entities.values() if not e.in_flight], default=None)
+
+    def _process(self, key, entity):
+        try:
+            value = entity.fetch()
+        except Exception as e:
+            with self._condition:
+                entity.due = time.monotonic() + min(self.RETRY_DELAY, entity.max_age)
+            if self._on_error is not None:
+                self._on_error(key, e)
+        else:
+            with self._condition:
+                entity.value = value
+                entity.fetched_at = time.monotonic()
+                entity.due = entity.fetched_at + entity.max_age
+            if self._on_update is not None:
+                self._on_update(key, value)
+        finally:
+            with self._condition:
+                self._release(entity)
@@ -0,0 +1,74 @@
+import copy
+import threading
+
+
+class _HTCall:
+    """Call in flight in a HTSingleFlight"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class HTSingleFlight:
+    """
+    Share the result of concurrent identical calls
+
+    While a call is in flight for a key, later calls with the same key wait
+    for it and get its result, or a copy of its exception caused by the
+    original one, instead of running again.
+    Results are not kept once the call is finished. It can be shared
+    between threads.
+    """
+
+    def __init__(self):
+        """
+        Initialize a HTSingleFlight instance
+        """
+        self._calls = dict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._calls)
+
+    def do(self, key, function):
+        """
+        Call a function, unless a call with the same key is in flight
+
+        :param key: key of the call
+        :param function: function called without argument
+        :type key: hashable
+        :type function: callable
+        :return: result of the function, shared by concurrent calls with the same key
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _HTCall()
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = function()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is None:
+            return call.result
+        elif leader:
+            raise call.error
+
+        # Each waiting call raises its own exception, so that tracebacks of
+        # concurrent calls are not mixed
+        try:
+            error = copy.copy(call.error).with_traceback(None)
+        except Exception:
+            raise call.error
+        raise error from call.error
@@ -0,0 +1,79 @@
+import json
+import os
+
+
+def load_json(path):
+    """
+    Load data saved by dump_json
+
+    :param path: path of the file
+    :type path: str
+    :return: loaded data, or None if the file does not exist
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def dump_json(path, data):
+    """
+    Save data as JSON, atomically
+
+    Data is written to a temporary file which then replaces the target file,
+    so that a crash never leaves a truncated file.
+
+    :param path: path of the file
+    :param data: JSON serializable data
+    :type path: str
+    """
+    dump_text(path, json.dumps(data))
+
+
+def dump_text(path, text):
+    """
+    Save text, atomically
+
+    :param path: path of the file
+    :param text: text to save
+    :type path: str
+    :type text: str
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def dump_lines(path, lines):
+    """
+    Save lines of a log file, atomically
+
+    :param path: path of the file
+    :param lines: lines, without line endings
+    :type path: str
+    :type lines: iterable of str
+    """
+    dump_text(path, "".join(f"{line}\n" for line in lines))
+
+
+def load_lines(path):
+    """
+    Load lines appended to a log file
+
+    A last line without line ending, left by a crash while appending, is
+    ignored.
+
+    :param path: path of the file
+    :type path: str
+    :return: lines, without line endings, or an empty list if the file does not exist
+    :rtype: list of str
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [line[:-1] for line in f if line.endswith("\n")]
+    except FileNotFoundError:
+        return []
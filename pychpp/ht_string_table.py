@@ -0,0 +1,57 @@
+import collections
+import threading
+
+
+class HTStringTable:
+    """
+    Bounded table of interned strings
+
+    Equal strings parsed from different responses (team names, country
+    names, ...) are replaced by a single shared instance. When max_size is
+    reached, the least recently used string is forgotten. It can be shared
+    between threads.
+    """
+
+    def __init__(self, max_size=65536):
+        """
+        Initialize a HTStringTable instance
+
+        :param max_size: maximum number of strings in the table
+        :type max_size: int
+        """
+        if not isinstance(max_size, int) or max_size < 1:
+            raise ValueError("max_size must be a positive integer")
+
+        self.max_size = max_size
+        self._strings = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._strings)
+
+    def intern(self, text):
+        """
+        Get the shared instance of a string
+
+        :param text: string to intern
+        :type text: str
+        :return: a string equal to text, shared with previous calls
+        :rtype: str
+        """
+        with self._lock:
+            shared = self._strings.get(text)
+            if shared is None:
+                shared = self._strings[text] = text
+                if len(self._strings) > self.max_size:
+                    self._strings.popitem(last=False)
+            else:
+                self._strings.move_to_end(text)
+
+        return shared
+
+    def clear(self):
+        """
+        Forget every string
+        """
+        with self._lock:
+            self._strings.clear()
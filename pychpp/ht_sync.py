@@ -0,0 +1,191 @@
+import datetime
+import json
+import os
+import threading
+
+from pychpp import chpp as _chpp
+from pychpp import ht_concurrency, ht_matches_archive, ht_storage, ht_xml
+
+
+class HTMatchesArchiveSync:
+    """
+    Incremental synchronization of teams matches archives
+
+    For every team, the date of the newest ingested match (watermark) is
+    stored in a state file. A sync requests the matches archive from this
+    watermark only (or from the oldest match which was not finished yet
+    during a previous sync), and fetches details of new matches and of
+    unfinished ones only. Once a team is synchronized, its new state is
+    appended to a log next to the state file, which is synced to disk every
+    SYNC_EVERY teams. The log is merged into the state file, written
+    atomically, at the start and at the end of every sync.
+    """
+
+    _STATE_VERSION = 1
+
+    # Number of synchronized teams between two syncs of the log
+    SYNC_EVERY = 100
+
+    def __init__(self, chpp, state_path, handler, youth=False, events=False,
+                 first_match_date=None, max_workers=None):
+        """
+        Initialize a HTMatchesArchiveSync instance
+
+        :param chpp: CHPP instance of connected user
+        :param state_path: path of the file where watermarks are saved
+        :param handler: function called with team Hattrick ID and HTMatch of every new or updated match,
+                        always from the synchronizing thread
+        :param youth: define if synchronized teams are youth teams or not
+        :param events: define if match events have to be requested
+        :param first_match_date: begin date of first sync of a team, defaults to None (current season)
+        :param max_workers: maximum number of teams synchronized concurrently
+        :type chpp: CHPP
+        :type state_path: str
+        :type handler: callable
+        :type youth: bool
+        :type events: bool
+        :type first_match_date: datetime.datetime, optional
+        :type max_workers: int, optional
+        """
+        if not isinstance(chpp, _chpp.CHPP):
+            raise ValueError("chpp must be a CHPP instance")
+        elif not callable(handler):
+            raise ValueError("handler must be callable")
+        elif not isinstance(youth, bool):
+            raise ValueError("youth must be a boolean")
+        elif not isinstance(events, bool):
+            raise ValueError("events must be a boolean")
+
+        self._chpp = chpp
+        self._state_path = state_path
+        self._handler = handler
+        self._youth = youth
+        self._events = events
+        self._first_match_date = first_match_date
+        self._max_workers = ht_concurrency.resolve_max_workers(max_workers)
+        self._lock = threading.Lock()
+
+        self._state = ht_storage.load_json(state_path)
+        if self._state is None:
+            self._state = {"version": self._STATE_VERSION, "teams": dict()}
+        elif self._state.get("version") != self._STATE_VERSION:
+            raise ValueError(f"{state_path} is not a compatible state file")
+
+        # States of teams synchronized since the state file was written
+        for line in ht_storage.load_lines(self._log_path):
+            team_ht_id, team_state = json.loads(line)
+            self._state["teams"][str(team_ht_id)] = team_state
+
+    @property
+    def _log_path(self):
+        """Path of the log of synchronized teams"""
+        return f"{self._state_path}.log"
+
+    def _compact(self):
+        """Merge the log into the state file"""
+        with self._lock:
+            ht_storage.dump_json(self._state_path, self._state)
+            # A crash before the log is emptied only leads to merge it again
+            ht_storage.dump_lines(self._log_path, [])
+
+    def watermark(self, team_ht_id):
+        """
+        Date of the newest ingested match of a team
+
+        :param team_ht_id: Hattrick ID of team
+        :type team_ht_id: int
+        :return: watermark, or None if the team was never synchronized
+        :rtype: datetime.datetime
+        """
+        with self._lock:
+            team_state = self._state["teams"].get(str(team_ht_id))
+
+        return self._date_from_text(team_state["watermark"]) if team_state is not None else None
+
+    @staticmethod
+    def _date_from_text(text):
+        return datetime.datetime.strptime(text, "%Y-%m-%d %H:%M:%S") if text is not None else None
+
+    def _sync_team(self, team_ht_id):
+        """Fetch new matches of a team, and compute its new state"""
+        with self._lock:
+            team_state = self._state["teams"].get(str(team_ht_id),
+                                                  {"watermark": None, "seen": [], "pending": {}})
+
+        watermark = self._date_from_text(team_state["watermark"])
+        # Matches played at the watermark date are returned again by Hattrick,
+        # only those which were not ingested yet are fetched
+        seen = set(team_state["seen"])
+        # Matches not finished yet, by Hattrick ID, with their date
+        pending = {int(k): self._date_from_text(v) for k, v in team_state["pending"].items()}
+
+        first_match_date = min([watermark] + list(pending.values())) if watermark is not None else None
+
+        def is_new(item):
+            return (item.ht_id in pending
+                    or watermark is None
+                    or item.date > watermark
+                    or (item.date == watermark and item.ht_id not in seen))
+
+        archive = ht_matches_archive.HTMatchesArchive(chpp=self._chpp,
+                                                      ht_id=team_ht_id,
+                                                      youth=self._youth,
+                                                      first_match_date=first_match_date or self._first_match_date,
+                                                      )
+        matches = archive.hydrate(match_filter=is_new, events=self._events, max_workers=1)
+
+        dates = {i.ht_id: i.date for i in archive}
+        finished = [m.ht_id for m in matches if m.is_finished]
+
+        new_watermark = max([dates[ht_id] for ht_id in finished] + ([watermark] if watermark is not None else []),
+                            default=None)
+        new_seen = {ht_id for ht_id in finished if dates[ht_id] == new_watermark}
+        if new_watermark == watermark:
+            new_seen |= seen
+
+        new_state = {"watermark": ht_xml.HTXml.ht_date_to_text(new_watermark) if new_watermark is not None else None,
+                     "seen": sorted(new_seen),
+                     "pending": {str(m.ht_id): ht_xml.HTXml.ht_date_to_text(dates[m.ht_id])
+                                 for m in matches if not m.is_finished},
+                     }
+
+        return matches, new_state
+
+    def sync(self, team_ht_ids):
+        """
+        Synchronize teams matches archives
+
+        :param team_ht_ids: Hattrick ID of teams to synchronize
+        :type team_ht_ids: iterable of int
+        :return: number of new or updated matches by team Hattrick ID
+        :rtype: dict
+        """
+        counts = dict()
+
+        # Log is emptied, without a line left incomplete by a crash, then
+        # states are only appended to it
+        self._compact()
+
+        try:
+            with open(self._log_path, "a", encoding="utf-8") as log:
+                for team_ht_id, (matches, new_state) in ht_concurrency.bounded_imap(self._sync_team,
+                                                                                   team_ht_ids,
+                                                                                   self._max_workers):
+                    for match in matches:
+                        self._handler(team_ht_id, match)
+
+                    # State is saved only once matches are handled, so that a failure
+                    # leads to fetch them again on next sync
+                    with self._lock:
+                        self._state["teams"][str(team_ht_id)] = new_state
+                        log.write(f"{json.dumps([team_ht_id, new_state])}\n")
+                        log.flush()
+
+                    counts[team_ht_id] = len(matches)
+                    if len(counts) % self.SYNC_EVERY == 0:
+                        os.fsync(log.fileno())
+        finally:
+            # Whole state is written once, even if the sync failed
+            self._compact()
+
+        return counts
@@ -110,31 +110,78 @@ class HTTeam(HTCoreTeam):
 
         super().__init__(**kwargs)
 
-    @property
+    @classmethod
+    def from_teamdetails(cls, chpp, data, keep_raw=None, exclude=None):
+        """
+        Build every team of a teamdetails response
+
+        Built teams are added to the identity map of chpp.
+
+        :param chpp: CHPP instance of connected user
+        :param data: teamdetails response
+        :param keep_raw: define if teams keep raw xml data once parsed, defaults to chpp.keep_raw
+        :param exclude: Hattrick ID of a team not to build, usually the one already built from data
+        :type chpp: CHPP
+        :type data: xml.etree.ElementTree.Element
+        :type keep_raw: bool, optional
+        :type exclude: int, optional
+        :rtype: list of HTTeam
+        """
+        teams = [cls(chpp=chpp, ht_id=ht_id, data=data, keep_raw=keep_raw)
+                 for ht_id in (ht_xml.HTXml.ht_int(t_id) for t_id in data.iterfind("Teams/Team/TeamID"))
+                 if ht_id != exclude]
+
+        for team in teams:
+            chpp.identity_map.add(team)
+
+        return teams
+
+    @ht_model.related
     def user(self):
         """Owner of the current team"""
         return ht_user.HTUser(chpp=self._chpp, ht_id=self.user_ht_id)
 
-    @property
-    def players(self):
-        """Players list of current team"""
+    def iter_players(self):
+        """
+        Iterate over players of current team
+
+        Players are requested on Hattrick on each call, and built one by one
+        without being kept by the team.
+
+        :rtype: generator of ht_player.HTPlayer
+        """
         data = self._chpp.request(file="players",
                                   version="2.4",
                                   actionType="view",
                                   teamID=self.ht_id).find("Team").find("PlayerList")
 
-        return [ht_player.HTPlayer(chpp=self._chpp,
-                                   data=p_data,
-                                   team_ht_id=self.ht_id) for p_data in data.findall("Player")]
+        for p_data in data.iterfind("Player"):
+            yield ht_player.HTPlayer(chpp=self._chpp,
+                                     data=p_data,
+                                     team_ht_id=self.ht_id)
 
-    @property
+    def fetch_players(self):
+        """
+        Fetch players list of current team, replacing the cached one
+
+        :rtype: list of ht_player.HTPlayer
+        """
+        self._related["players"] = list(self.iter_players())
+        return self._related["players"]
+
+    @ht_model.related
+    def players(self):
+        """Players list of current team, fetched on first access"""
+        return self.fetch_players()
+
+    @ht_model.related
     def youth_team(self):
         """Youth team of current team"""
         return HTYouthTeam(chpp=self._chpp,
                            ht_id=self.youth_team_ht_id,
                            ) if self.youth_team_ht_id != 0 else None
 
-    @property
+    @ht_model.related
     def arena(self):
         """Team arena"""
         return ht_arena.HTArena(chpp=self._chpp, ht_id=self.arena_ht_id)
@@ -194,18 +241,35 @@ class HTYouthTeam(HTCoreTeam):
 
         super().__init__(**kwargs)
 
-    @property
-    def players(self):
-        """Players list of current team"""
+    def iter_players(self):
+        """
+        Iterate over players of current team
+
+        Players are requested on Hattrick on each call, and built one by one
+        without being kept by the team.
+
+        :rtype: generator of ht_player.HTYouthPlayer
+        """
         data = self._chpp.request(file="youthplayerlist",
                                   version="2.4",
                                   actionType="details",
                                   youthTeamID=self.ht_id).find("PlayerList")
 
-        # Force fetch if ht_id is None
-        if self._data is None:
-            self._fetch()
+        for p_data in data.iterfind("YouthPlayer"):
+            yield ht_player.HTYouthPlayer(chpp=self._chpp,
+                                          data=p_data,
+                                          team_ht_id=self.ht_id)
+
+    def fetch_players(self):
+        """
+        Fetch players list of current team, replacing the cached one
+
+        :rtype: list of ht_player.HTYouthPlayer
+        """
+        self._related["players"] = list(self.iter_players())
+        return self._related["players"]
 
-        return [ht_player.HTYouthPlayer(chpp=self._chpp,
-                                        data=p_data,
-                                        team_ht_id=self.ht_id) for p_data in data.findall("YouthPlayer")]
+    @ht_model.related
+    def players(self):
+        """Players list of current team, fetched on first access"""
+        return self.fetch_players()
@@ -0,0 +1,221 @@
+import threading
+import time
+
+from pychpp import chpp as _chpp
+from pychpp import ht_concurrency, ht_error, ht_rate_limiter
+
+
+class HTTokenPool(_chpp.CHPP):
+    """
+    CHPP connection spreading requests over access tokens of several users
+
+    An action, or a request of a file only returned to the owner of a team
+    (see _OWNER_FILES and HTNotOwnedTeamError), is sent with the access token
+    of the user owning the team if any. A request without any ID parameter
+    concerns the connected user, and is sent with the first access token,
+    unless its file doesn't depend on the user. Any other request is sent
+    with the least loaded access token.
+
+    Owners of teams are reloaded every owners_ttl seconds, and when Hattrick
+    answers that a team is not owned by the chosen user.
+
+    Each access token has its own rate limit, the HTTP session is shared by
+    all access tokens. Once pickled, a pool is replaced by a CHPP instance
+    using its first access token.
+    """
+
+    # Files which Hattrick only returns to the owner of the requested team
+    _OWNER_FILES = ("challenges", "economy", "fans", "matchorders", "staff", "training", "youthplayerlist")
+
+    # Files which don't depend on the connected user
+    _USER_INDEPENDENT_FILES = ("worlddetails", "worldlanguages", "translations", "nationalteams")
+
+    def __init__(self, consumer_key, consumer_secret, access_tokens, rate=None, owners_ttl=3600.0, **kwargs):
+        """
+        Initialization of a HTTokenPool instance
+
+        :param consumer_key: Consumer Key of the application
+        :param consumer_secret: Consumer Secret of the application
+        :param access_tokens: access tokens of users, as returned by get_access_token,
+                              or as (key, secret) tuples
+        :param rate: maximum number of requests per second for each access token,
+                     defaults to None (no limit)
+        :param owners_ttl: time after which owners of teams are reloaded, in seconds
+        :type consumer_key: str
+        :type consumer_secret: str
+        :type access_tokens: iterable of dict or tuple
+        :type rate: int, float, optional
+        :type owners_ttl: int, float
+        :key keep_raw: define if models keep raw xml data once parsed
+        :key intern_strings: define if equal parsed strings are shared
+        """
+        access_tokens = [(t["key"], t["secret"]) if isinstance(t, dict) else tuple(t) for t in access_tokens]
+        if not access_tokens:
+            raise ValueError("access_tokens must contain at least one access token")
+        elif not isinstance(owners_ttl, (int, float)) or type(owners_ttl) == bool or owners_ttl <= 0:
+            raise ValueError("owners_ttl must be a positive number")
+
+        super().__init__(consumer_key, consumer_secret, *access_tokens[0], **kwargs)
+
+        self.members = [_chpp.CHPP(consumer_key, consumer_secret, key, secret) for key, secret in access_tokens]
+        for member in self.members:
+            # HTTP session doesn't depend on access tokens
+            member._http_session = self._http_session
+
+        self._rate_limiters = [ht_rate_limiter.HTRateLimiter(rate) if rate is not None else None
+                               for _ in self.members]
+        self._in_flight = [0] * len(self.members)
+        self._lock = threading.Lock()
+
+        # Index of the owner of each team and youth team, loaded on first use
+        self.owners_ttl = owners_ttl
+        self._owners = None
+        self._owners_expires = 0.0
+        self._owners_lock = threading.Lock()
+
+    @classmethod
+    def _owner_keys(cls, kwargs):
+        """
+        (kind, Hattrick ID) of teams and youth teams whose owner must send a request
+
+        Only files which Hattrick returns to the owner only, and actions,
+        must be sent by the owner: other requests can be sent by anyone.
+        """
+        if (str(kwargs.get("file", "")).lower() not in cls._OWNER_FILES
+                and str(kwargs.get("actionType", "view")).lower() == "view"):
+            return []
+        return [("youth_team" if k.lower() == "youthteamid" else "team", int(v))
+                for k, v in kwargs.items() if k.lower() in ("teamid", "youthteamid") and v]
+
+    def _fetch_owners(self):
+        """Load owners of teams and youth teams from compendiums of users"""
+        def fetch_compendium(index):
+            # Each user's compendium is requested with their access token,
+            # within its rate limit, through circuit breaker and coalescing
+            kwargs = {"file": "managercompendium", "version": "1.2"}
+            return self._send(("managercompendium", index), kwargs,
+                              lambda: self.parse_response(self._request_raw_with(self._reserve(index), **kwargs)),
+                              True)
+
+        owners = dict()
+        for index, data in enumerate(ht_concurrency.bounded_map(fetch_compendium, range(len(self.members)))):
+            for team in data.iterfind("Manager/Teams/Team"):
+                owners[("team", int(team.find("TeamId").text))] = index
+                youth_team_ht_id = team.find("YouthTeam/YouthTeamId")
+                if youth_team_ht_id is not None and int(youth_team_ht_id.text):
+                    owners[("youth_team", int(youth_team_ht_id.text))] = index
+
+        with self._owners_lock:
+            self._owners = owners
+            self._owners_expires = time.monotonic() + self.owners_ttl
+
+        return owners
+
+    def _load_owners(self, outdated=None):
+        """
+        Index of the owner of each team and youth team, by (kind, Hattrick ID)
+
+        Owners are fetched without holding any lock, concurrent loads are
+        coalesced.
+
+        :param outdated: owners known to be outdated, reloaded unless they
+                         were already reloaded by another thread
+        :type outdated: dict, optional
+        :rtype: dict
+        """
+        with self._owners_lock:
+            owners = self._owners
+            if owners is not None and owners is not outdated and self._owners_expires > time.monotonic():
+                return owners
+
+        return self._single_flight.do("owners", self._fetch_owners)
+
+    def refresh_owners(self):
+        """
+        Reload owners of teams, e.g. after a team changed hands
+        """
+        with self._owners_lock:
+            self._owners_expires = 0.0
+        self._load_owners()
+
+    def owner(self, team_ht_id, youth=False):
+        """
+        CHPP instance of the user owning a team
+
+        :param team_ht_id: Hattrick ID of a team or a youth team
+        :param youth: define if team_ht_id is the Hattrick ID of a youth team
+        :type team_ht_id: int
+        :type youth: bool
+        :return: CHPP instance, or None if no user of the pool owns the team
+        :rtype: CHPP
+        """
+        index = self._load_owners().get(("youth_team" if youth else "team", team_ht_id))
+        return self.members[index] if index is not None else None
+
+    def _route(self, kwargs):
+        """Choose the access token to use for a request, and reserve it"""
+        owner_keys = self._owner_keys(kwargs)
+
+        if owner_keys:
+            owners = self._load_owners()
+            owner = next((owners[k] for k in owner_keys if k in owners), None)
+        elif (not any(k.lower().endswith("id") and v not in ("", None) for k, v in kwargs.items())
+              and str(kwargs.get("file", "")).lower() not in self._USER_INDEPENDENT_FILES):
+            owner = 0
+        else:
+            owner = None
+
+        with self._lock:
+            if owner is None:
+                owner = min(range(len(self.members)),
+                            key=lambda i: (self._in_flight[i],
+                                           self._rate_limiters[i].delay() if self._rate_limiters[i] else 0.0))
+            self._in_flight[owner] += 1
+
+        return owner
+
+    def _reserve(self, index):
+        """Reserve an access token for a request"""
+        with self._lock:
+            self._in_flight[index] += 1
+        return index
+
+    def load(self):
+        """
+        Number of requests in flight for each access token
+
+        :rtype: list of int
+        """
+        with self._lock:
+            return list(self._in_flight)
+
+    def request_raw(self, **kwargs):
+        """
+        Send a request via the CHPP API with the most suitable access token
+
+        :return: xml document fetched on Hattrick
+        :rtype: str
+        """
+        return self._request_raw_with(self._route(kwargs), **kwargs)
+
+    def _request_raw_with(self, index, **kwargs):
+        """Send a request with a reserved access token, and release it"""
+        try:
+            if self._rate_limiters[index] is not None:
+                self._rate_limiters[index].acquire()
+            return self.members[index].request_raw(**kwargs)
+        finally:
+            with self._lock:
+                self._in_flight[index] -= 1
+
+    def _send(self, kind, kwargs, fetch, use_negative_cache):
+        # A team may have changed hands since owners were loaded: they are
+        # reloaded and the request is sent again
+        owners = self._owners
+        try:
+            return super()._send(kind, kwargs, fetch, use_negative_cache)
+        except ht_error.HTNotOwnedTeamError:
+            if not self._owner_keys(kwargs) or owners is None:
+                raise
+            self._load_owners(outdated=owners)
+            return super()._send(kind, kwargs, fetch, use_negative_cache)
@@ -1,5 +1,5 @@
 from pychpp import ht_model, ht_xml
-from pychpp import ht_team
+from pychpp import ht_concurrency, ht_team
 
 
 class HTUser(ht_model.HTModel):
@@ -43,7 +43,29 @@ class HTUser(ht_model.HTModel):
     def __repr__(self):
         return f"<HTUser object : {self.username} ({self.ht_id})>"
 
-    @property
+    @ht_model.related
     def teams(self):
-        """Teams list of current user"""
-        return [ht_team.HTTeam(chpp=self._chpp, ht_id=team_ht_id) for team_ht_id in self._teams_ht_id]
+        """
+        Teams list of current user
+
+        Teams known by the identity map of chpp are returned without any
+        request. Otherwise, teams are built from a single teamdetails
+        response listing all teams of the user, and teams missing from this
+        response are fetched concurrently.
+        """
+        known = [self._chpp.identity_map.get(ht_team.HTTeam, team_ht_id) for team_ht_id in self._teams_ht_id]
+        if all(team is not None for team in known):
+            return known
+
+        data = self._chpp.request(file=ht_team.HTTeam._SOURCE_FILE,
+                                  version=ht_team.HTTeam._SOURCE_FILE_VERSION,
+                                  userID=self.ht_id,
+                                  )
+        teams = {team.ht_id: team for team in ht_team.HTTeam.from_teamdetails(chpp=self._chpp, data=data)}
+
+        missing = [team_ht_id for team_ht_id in self._teams_ht_id if team_ht_id not in teams]
+        teams.update(zip(missing,
+                         ht_concurrency.bounded_map(lambda team_ht_id: self._chpp.team(ht_id=team_ht_id),
+                                                    missing)))
+
+        return [teams[team_ht_id] for team_ht_id in self._teams_ht_id]
@@ -41,9 +41,14 @@ class HTWorld(ht_model.HTModel):
     def __repr__(self):
         return f"<{self.__class__.__name__} object>"
 
+    def _fill_raw_attributes(self):
+        self._leagues = self.leagues
+
     @property
     def leagues(self):
-        return [HTCountryLeague(chpp=self._chpp, data=p_data)
+        if self._data is None:
+            return self._leagues
+        return [HTCountryLeague(chpp=self._chpp, data=p_data, keep_raw=self._keep_raw)
                 for p_data in self._data.find("LeagueList").findall("League")]
 
     def league(self, ht_id=None, name=None):
@@ -103,13 +108,21 @@ class HTCountryLeague(ht_model.HTModel):
     def __repr__(self):
         return f"<{self.__class__.__name__} object : {self.league_name} ({self.ht_id})>"
 
+    def _fill_raw_attributes(self):
+        self._country = self.country
+        self._cups = self.cups
+
     @property
     def country(self):
-        return HTCountry(chpp=self._chpp, data=self._data.find("Country"))
+        if self._data is None:
+            return self._country
+        return HTCountry(chpp=self._chpp, data=self._data.find("Country"), keep_raw=self._keep_raw)
 
     @property
     def cups(self):
-        return [HTCup(chpp=self._chpp, data=p_data)
+        if self._data is None:
+            return self._cups
+        return [HTCup(chpp=self._chpp, data=p_data, keep_raw=self._keep_raw)
                 for p_data in self._data.find("Cups").findall("Cup")]
 
 
@@ -139,14 +152,19 @@ class HTCountry(ht_model.HTModel):
     def __repr__(self):
         return f"<{self.__class__.__name__} object : {self.country_name} ({self.ht_id})>"
 
+    def _fill_raw_attributes(self):
+        self._regions = self.regions
+
     @property
     def regions(self):
+        if self._data is None:
+            return self._regions
         if self._data.find("RegionList") is not None:
             return [
                 HTRegionItem(
                     chpp=self._chpp,
                     ht_id=p_data.find("RegionID").text,
-                    name=p_data.find("RegionName").text
+                    name=ht_xml.HTXml.ht_str(p_data.find("RegionName"))
                 )
                 for p_data in self._data.find("RegionList").findall("Region")
             ]
@@ -1,4 +1,7 @@
+import contextlib
 import datetime
+import itertools
+import threading
 
 from pychpp import ht_skill, ht_age, ht_rank
 
@@ -8,9 +11,33 @@ class HTXml:
     Gather different method to parse xml files fetched on Hattrick
     """
 
-    @staticmethod
-    def ht_str(data):
-        return str(data.text)
+    # String table used to intern parsed strings in the current thread
+    _local = threading.local()
+
+    @classmethod
+    @contextlib.contextmanager
+    def string_table(cls, table):
+        """
+        Intern strings parsed in the current thread through a string table
+
+        :param table: string table to use, None to disable interning
+        :type table: ht_string_table.HTStringTable
+        """
+        previous = getattr(cls._local, "string_table", None)
+        cls._local.string_table = table
+        try:
+            yield table
+        finally:
+            cls._local.string_table = previous
+
+    @classmethod
+    def ht_interned(cls, text):
+        table = getattr(cls._local, "string_table", None)
+        return table.intern(text) if table is not None and text is not None else text
+
+    @classmethod
+    def ht_str(cls, data):
+        return cls.ht_interned(str(data.text))
 
     @staticmethod
     def ht_int(data):
@@ -24,12 +51,12 @@ class HTXml:
     def ht_bool(data):
         return True if data.text.capitalize() == "True" else False
 
-    @staticmethod
-    def ht_goals(data):
+    @classmethod
+    def ht_goals(cls, data):
         goals = list()
         for goal in data.findall('Goal'):
             goals.append({"player_id": int(goal.find("ScorerPlayerID").text),
-                          "player_name": goal.find("ScorerPlayerName").text,
+                          "player_name": cls.ht_interned(goal.find("ScorerPlayerName").text),
                           "home_goals": int(goal.find("ScorerHomeGoals").text),
                           "away_goals": int(goal.find("ScorerAwayGoals").text),
                           "minute": int(goal.find("ScorerMinute").text),
@@ -37,15 +64,16 @@ class HTXml:
                           })
         return goals
 
-    @staticmethod
-    def ht_match_events(data):
+    @classmethod
+    def ht_match_events(cls, data, start=0):
         events = list()
-        for event in data.findall('Event'):
+        # Only events from index start are parsed
+        for event in itertools.islice(data.iterfind('Event'), start, None):
             events.append({"minute":            int(event.find("Minute").text),
                           "match_part":         int(event.find("MatchPart").text),
                           "id":                 int(event.find("EventTypeID").text),
                           "variation":          int(event.find("EventVariation").text),
-                          "description":        event.find("EventText").text,
+                          "description":        cls.ht_interned(event.find("EventText").text),
                           "subject_team_id":    int(event.find("SubjectTeamID").text),
                           "subject_player_id":  int(event.find("SubjectPlayerID").text),
                           "object_player_id":   int(event.find("ObjectPlayerID").text),
@@ -140,11 +168,11 @@ class HTXml:
     def ht_teams_ht_id(data):
         return [int(t.find("TeamId").text) for t in data.findall("Team")]
 
-    @staticmethod
-    def ht_ranks(data):
+    @classmethod
+    def ht_ranks(cls, data):
         return [ht_rank.HTRank(user_ht_id=int(i.find("UserId").text),
                                team_ht_id=int(i.find("TeamID").text),
-                               team_name=i.find("TeamName").text,
+                               team_name=cls.ht_interned(i.find("TeamName").text),
                                position=int(i.find("Position").text),
                                position_change=int(i.find("PositionChange").text),
                                matches=int(i.find("Matches").text),
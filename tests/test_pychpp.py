@@ -18,7 +18,10 @@ from pychpp.ht_challenge import HTChallengeManager
 from pychpp.ht_league import HTLeague
 from pychpp.ht_rank import HTRank
 from pychpp.ht_world import HTCountry, HTCup, HTCountryLeague, HTRegionItem, HTWorld
-from pychpp.ht_error import HTUnauthorizedAction, UnknownLeagueError
+from pychpp.ht_error import HTCircuitOpenError, HTUnauthorizedAction, HTUndefinedError, HTUnknownMatchIdError
+from pychpp.ht_error import HTUnknownTeamIdError
+from pychpp.ht_error import UnknownLeagueError
+from pychpp.ht_token_pool import HTTokenPool
 
 PYCHPP_CONSUMER_KEY = os.environ["PYCHPP_CONSUMER_KEY"]
 PYCHPP_CONSUMER_SECRET = os.environ["PYCHPP_CONSUMER_SECRET"]
@@ -60,6 +63,45 @@ def test_request_token():
             and 'https://chpp.hattrick.org/oauth/authorize.aspx?scope=&oauth_token=' in auth['url'])
 
 
+def test_request_signature():
+    from rauth.oauth import HmacSha1Signature
+
+    chpp = CHPP(consumer_key=PYCHPP_CONSUMER_KEY,
+                consumer_secret=PYCHPP_CONSUMER_SECRET,
+                access_token_key=PYCHPP_ACCESS_TOKEN_KEY,
+                access_token_secret=PYCHPP_ACCESS_TOKEN_SECRET,
+                )
+
+    # Lists are sent as repeated parameters, and signed as such
+    for params in ({"file": "worlddetails", "version": "1.8", "leagueID": "25",
+                    "includeRegions": False, "sourceSystem": "hattrick"},
+                   {"file": "challenges", "version": "1.6", "actionType": "challengeable",
+                    "suggestedTeamIds": ["591993", "44307", "1750803"], "teamId": ""}):
+        signed = chpp.signer.sign("GET", chpp.base_url, params)
+        oauth_params = {k: v for k, v in signed.items()
+                        if k.startswith("oauth_") and k != "oauth_signature"}
+
+        assert signed["oauth_signature"] == HmacSha1Signature().sign(PYCHPP_CONSUMER_SECRET,
+                                                                     PYCHPP_ACCESS_TOKEN_SECRET,
+                                                                     "GET",
+                                                                     chpp.base_url,
+                                                                     oauth_params,
+                                                                     {"params": params},
+                                                                     )
+
+
+def test_shared_http_session():
+    from pychpp import ht_concurrency
+
+    chpp = CHPP(consumer_key=PYCHPP_CONSUMER_KEY,
+                consumer_secret=PYCHPP_CONSUMER_SECRET,
+                )
+
+    # Every thread pool reuses the connections of a single session
+    sessions = ht_concurrency.bounded_map(lambda _: chpp._http_session(), range(4))
+    assert all(s is sessions[0] for s in sessions)
+
+
 @pytest.fixture
 def chpp():
     return CHPP(consumer_key=PYCHPP_CONSUMER_KEY,
@@ -90,6 +132,13 @@ def test_get_current_team(chpp):
     for p in players:
         assert isinstance(p, HTPlayer)
 
+    assert team.players is players
+    assert [p.ht_id for p in team.iter_players()] == [p.ht_id for p in players]
+
+    team.invalidate("players")
+    assert team.players is not players
+    assert team.fetch_players() is team.players
+
 
 def test_get_specific_team(chpp):
     team = chpp.team(ht_id=591993)
@@ -119,6 +168,14 @@ def test_get_specific_team(chpp):
     assert arena.name == "thekiki's evil"
     assert re.match(ARENA_PATTERN, arena.url)
 
+    prefetched_team = chpp.team(ht_id=591993, prefetch=["user", "arena"])
+    assert prefetched_team.user is prefetched_team.user
+    assert prefetched_team.user.ht_id == 6336642
+    assert prefetched_team.arena.name == "thekiki's evil"
+
+    with pytest.raises(ValueError):
+        chpp.team(ht_id=591993, prefetch=["unknown"])
+
 
 def test_get_secondary_team(chpp):
     team = chpp.team(ht_id=44307)
@@ -146,6 +203,30 @@ def test_get_secondary_team(chpp):
     assert arena.name == "Grynvallen"
     assert re.match(ARENA_PATTERN, arena.url)
 
+    # Teams are requested again unless identity_map_ttl is set
+    assert chpp.team(ht_id=44307) is not chpp.team(ht_id=44307)
+
+    cached_chpp = CHPP(consumer_key=PYCHPP_CONSUMER_KEY,
+                       consumer_secret=PYCHPP_CONSUMER_SECRET,
+                       access_token_key=PYCHPP_ACCESS_TOKEN_KEY,
+                       access_token_secret=PYCHPP_ACCESS_TOKEN_SECRET,
+                       identity_map_ttl=60,
+                       )
+    team = cached_chpp.team(ht_id=44307)
+    other_teams = HTTeam.from_teamdetails(chpp=cached_chpp, data=team._data, exclude=44307)
+    assert len(other_teams) >= 1
+    assert 44307 not in [t.ht_id for t in other_teams]
+    for t in [team] + other_teams:
+        assert t.user_ht_id == 182085
+        assert cached_chpp.team(ht_id=t.ht_id) is t
+
+    # A known team without raw data is requested again if raw data are needed
+    cached_chpp.identity_map.clear()
+    lean_team = cached_chpp.team(ht_id=44307, keep_raw=False)
+    assert lean_team._data is None
+    assert cached_chpp.team(ht_id=44307, keep_raw=False) is lean_team
+    assert cached_chpp.team(ht_id=44307, keep_raw=True)._data is not None
+
 
 def test_get_current_user(chpp):
     user = chpp.user()
@@ -156,6 +237,32 @@ def test_get_current_user(chpp):
     assert isinstance(user.url, str)
     assert re.match(USER_PATTERN, user.url)
 
+    teams = user.teams
+    assert len(teams) >= 1
+    for team in teams:
+        assert isinstance(team, HTTeam)
+        assert team.user_ht_id == user.ht_id
+        fetched_team = chpp.team(ht_id=team.ht_id)
+        assert fetched_team is not team
+        assert team.name == fetched_team.name
+
+    # Teams already known by the identity map are returned without any request
+    cached_chpp = CHPP(consumer_key=PYCHPP_CONSUMER_KEY,
+                       consumer_secret=PYCHPP_CONSUMER_SECRET,
+                       access_token_key=PYCHPP_ACCESS_TOKEN_KEY,
+                       access_token_secret=PYCHPP_ACCESS_TOKEN_SECRET,
+                       identity_map_ttl=60,
+                       )
+    cached_user = cached_chpp.user()
+    cached_teams = cached_user.teams
+
+    def failing_request(**kwargs):
+        raise AssertionError("no request expected")
+
+    cached_chpp.request = failing_request
+    cached_user.invalidate("teams")
+    assert all(a is b for a, b in zip(cached_user.teams, cached_teams))
+
 
 def test_get_player(chpp):
     player = chpp.player(ht_id=432002549)
@@ -287,6 +394,15 @@ def test_get_other_user_matches_archives(chpp):
         assert 1755906 in (m.home_team_id, m.away_team_id)
         assert re.match(MATCH_PATTERN, m.url)
 
+    cache = dict()
+    details = ma1.hydrate(cache=cache)
+    assert len(details) == len(ma1)
+    for m, d in zip(ma1, details):
+        assert isinstance(d, HTMatch)
+        assert d.ht_id == m.ht_id
+        assert m.details is d
+        assert cache[m.ht_id] is d
+
     ma2 = chpp.matches_archive(ht_id=1755906,
                                season=60,
                                )
@@ -300,6 +416,78 @@ def test_get_other_user_matches_archives(chpp):
         assert re.match(MATCH_PATTERN, m.url)
 
 
+def test_get_matches_history(chpp):
+    ma = chpp.matches_archive(ht_id=1755906,
+                              first_match_date=datetime.datetime(2018, 4, 10),
+                              last_match_date=datetime.datetime(2018, 4, 30),
+                              )
+
+    history = list(chpp.matches_history(ht_id=1755906,
+                                        first_match_date=datetime.datetime(2018, 4, 10),
+                                        last_match_date=datetime.datetime(2018, 4, 30),
+                                        window=datetime.timedelta(days=7),
+                                        ))
+
+    assert len(history) == len({m.ht_id for m in history})
+    assert {m.ht_id for m in history} == {m.ht_id for m in ma}
+    for m in history:
+        assert isinstance(m, HTMatchesArchiveItem)
+
+
+def test_matches_archive_sync(chpp, tmp_path):
+    import json
+
+    state_path = str(tmp_path / "matches_archive.json")
+    handled = list()
+    files = list()
+    request_raw = chpp.request_raw
+
+    def recorded_request_raw(**kwargs):
+        files.append(kwargs["file"])
+        return request_raw(**kwargs)
+
+    chpp.request_raw = recorded_request_raw
+
+    def new_sync():
+        return chpp.matches_archive_sync(state_path=state_path,
+                                         handler=lambda team_ht_id, match: handled.append(match.ht_id),
+                                         first_match_date=datetime.datetime.now() - datetime.timedelta(days=60))
+
+    counts = new_sync().sync([591993])
+    assert counts[591993] == len(handled) > 0
+    assert files.count("matchesarchive") == 1
+    assert files.count("matchdetails") == len(handled)
+    # Log of synchronized teams is merged into the state file at the end of sync
+    assert os.path.getsize(f"{state_path}.log") == 0
+
+    def pending_count():
+        with open(state_path, encoding="utf-8") as f:
+            return len(json.load(f)["teams"]["591993"]["pending"])
+
+    # Second sync only requests the archive, and matches still unfinished if any
+    pending = pending_count()
+    files.clear()
+    handled.clear()
+    assert new_sync().sync([591993]) == {591993: pending}
+    assert files == ["matchesarchive"] + ["matchdetails"] * pending
+
+    # A match saved as unfinished is fetched again
+    with open(state_path, encoding="utf-8") as f:
+        state = json.load(f)
+    team_state = state["teams"]["591993"]
+    unfinished_ht_id = team_state["seen"][0]
+    team_state["pending"] = {str(unfinished_ht_id): team_state["watermark"]}
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+    files.clear()
+    handled.clear()
+    assert new_sync().sync([591993]) == {591993: 1}
+    assert files == ["matchesarchive", "matchdetails"]
+    assert handled == [unfinished_ht_id]
+    assert pending_count() == 0
+
+
 def test_get_match(chpp):
     m = chpp.match(ht_id=547513790, events=True)
 
@@ -331,11 +519,45 @@ def test_is_challengeable(chpp):
         assert isinstance(ich, dict)
         for b in ich.values():
             assert isinstance(b, bool)
+
+        ich = challenge.is_challengeable_bulk([1750803, 1165592, 591993], chunk_size=2)
+        assert isinstance(ich, dict)
+        assert set(ich.keys()) <= {1750803, 1165592, 591993}
+        for b in ich.values():
+            assert isinstance(b, bool)
     else:
         with pytest.raises(HTUnauthorizedAction):
             ich = challenge.is_challengeable(team_ht_id=1750803)
 
 
+def test_challenge_request_args(chpp):
+    import pickle
+    import xml.etree.ElementTree
+
+    requests_args = list()
+
+    def recorded_request(**kwargs):
+        requests_args.append(kwargs)
+        return xml.etree.ElementTree.fromstring("<HattrickData><Team><ChallengeableResult/></Team></HattrickData>")
+
+    chpp.request = recorded_request
+    challenge = HTChallengeManager(chpp, team_ht_id=591993)
+
+    challenge.decline(training_match_ht_id=42)
+    challenge.is_challengeable(team_ht_id=1750803)
+    challenge.withdraw(training_match_ht_id=43)
+
+    # Arguments of a call don't leak into later calls
+    assert requests_args[0]["trainingMatchId"] == "42" and "suggestedTeamIds" not in requests_args[0]
+    assert requests_args[1]["suggestedTeamIds"] == "1750803" and "trainingMatchId" not in requests_args[1]
+    assert requests_args[2]["trainingMatchId"] == "43" and "suggestedTeamIds" not in requests_args[2]
+    assert all(a["teamId"] == "591993" for a in requests_args)
+    assert "actionType" not in challenge._REQUEST_ARGS
+
+    unpickled_challenge = pickle.loads(pickle.dumps(challenge))
+    assert unpickled_challenge._REQUEST_ARGS == challenge._REQUEST_ARGS
+
+
 def test_league(chpp):
     league = chpp.league(ht_id=36378)
 
@@ -353,6 +575,37 @@ def test_league(chpp):
     assert league.ranks[3].position == 4
 
 
+def test_league_crawler(chpp):
+    entities = list()
+    crawler = chpp.league_crawler(sink=entities.append, include=("arena",))
+    counts = crawler.crawl([36378, 36378])
+
+    assert counts["league"] == 1
+    assert counts["team"] == len([e for e in entities if isinstance(e, HTTeam)]) == 8
+    assert len({e.ht_id for e in entities if isinstance(e, HTArena)}) == counts["arena"]
+    assert not any(isinstance(e, (HTPlayer, HTUser)) for e in entities)
+
+    assert crawler.crawl([36378]) == dict()
+
+    # Entities whose fetch failed are fetched by the next crawl
+    errors = list()
+    failures = list()
+    request_raw = chpp.request_raw
+
+    def failing_request_raw(**kwargs):
+        if kwargs["file"] == "arenadetails" and not failures:
+            failures.append(kwargs)
+            raise ConnectionError("Hattrick is unavailable")
+        return request_raw(**kwargs)
+
+    chpp.request_raw = failing_request_raw
+    crawler = chpp.league_crawler(sink=entities.append, include=("arena",),
+                                  on_error=lambda kind, ht_id, e: errors.append((kind, ht_id)))
+    crawler.crawl([36378])
+    assert len(errors) == 1 and errors[0][0] == "arena"
+    assert crawler.crawl([36378]) == {"arena": 1}
+
+
 def test_get_match_lineup(chpp):
     match_lineup = chpp.match_lineup(ht_id=660688698, team_id=86324)
 
@@ -380,6 +633,12 @@ def test_get_match_lineup(chpp):
     assert match_lineup.lineup_players[15].role_name == "Unknown role"
     assert re.match(PLAYER_PATTERN, match_lineup.lineup_players[15].url)
 
+    players = match_lineup.resolve_players()
+    assert len(players) == len({p.ht_id for p in match_lineup.lineup_players})
+    for p in match_lineup.lineup_players:
+        assert p.player is players[p.ht_id]
+        assert p.url == players[p.ht_id].url
+
     match_lineup = chpp.match_lineup(
         ht_id=116104524, team_id=2828377, source='youth')
     assert isinstance(match_lineup.lineup_players[0], HTLineupPlayer)
@@ -387,6 +646,20 @@ def test_get_match_lineup(chpp):
     assert re.match(YOUTH_PLAYER_PATTERN, match_lineup.lineup_players[0].url)
 
 
+def test_get_match_with_lineups(chpp):
+    m = chpp.match_with_lineups(ht_id=660688698, events=False)
+
+    assert isinstance(m, HTMatch)
+    assert isinstance(m.home_lineup, HTMatchLineup)
+    assert isinstance(m.away_lineup, HTMatchLineup)
+    assert m.home_lineup.team_id == m.home_team_id
+    assert m.away_lineup.team_id == m.away_team_id == 86324
+    assert m.lineups == (m.home_lineup, m.away_lineup)
+
+    m = chpp.match_with_lineups(ht_id=660688698, home_team_id=m.home_team_id, away_team_id=86324)
+    assert m.away_lineup.away_team_name == "Apanha Bolas FC"
+
+
 def test_get_world_details(chpp):
     portugal_details = chpp.world(ht_id=25, include_regions=True)
 
@@ -417,3 +690,507 @@ def test_get_world_details(chpp):
     assert re.match(COUNTRY_LEAGUE_PATTERN, portugal_details.league(ht_id=25).url)
     assert re.match(REGION_PATTERN, portugal_regions[0].region.url)
     assert re.match(CUP_PATTERN, portugal_details.league(ht_id=25).cups[0].url)
+
+
+def test_world_crawler(chpp, tmp_path):
+    checkpoint_path = str(tmp_path / "world.json")
+    regions = list()
+
+    class Interrupted(Exception):
+        pass
+
+    def interrupted_sink(region):
+        regions.append(region)
+        if len(regions) == 2:
+            raise Interrupted()
+
+    with pytest.raises(Interrupted):
+        chpp.world_crawler(sink=interrupted_sink, checkpoint_path=checkpoint_path, league_ht_ids=[25]).crawl()
+
+    # Only the first region is logged, the second one is fetched again
+    crawler = chpp.world_crawler(sink=regions.append, checkpoint_path=checkpoint_path, league_ht_ids=[25])
+    counts = crawler.crawl()
+    assert counts["done"] == counts["total"] == counts["fetched"] + 1
+    assert all(isinstance(r, HTRegion) for r in regions)
+    portugal_regions = chpp.world(ht_id=25, include_regions=True).league(ht_id=25).country.regions
+    assert {int(r.ht_id) for r in regions} == {int(r.ht_id) for r in portugal_regions}
+
+    assert crawler.crawl() == {"done": counts["total"], "total": counts["total"], "fetched": 0}
+
+
+def test_keep_raw(chpp):
+    portugal_details = chpp.world(ht_id=25, include_regions=True, keep_raw=False)
+    assert portugal_details._data is None
+    assert portugal_details.league(ht_id=25)._data is None
+    assert portugal_details.league(ht_id=25).country.country_name == "Portugal"
+    assert len(portugal_details.league(ht_id=25).country.regions) >= 1
+    assert len(portugal_details.league(ht_id=25).cups) >= 1
+
+    # With raw data, leagues are only built when they are accessed
+    raw_portugal_details = chpp.world(ht_id=25)
+    assert not hasattr(raw_portugal_details, "_leagues")
+    assert raw_portugal_details.league(ht_id=25).country.country_name == "Portugal"
+
+    lightweight_chpp = CHPP(consumer_key=PYCHPP_CONSUMER_KEY,
+                            consumer_secret=PYCHPP_CONSUMER_SECRET,
+                            access_token_key=PYCHPP_ACCESS_TOKEN_KEY,
+                            access_token_secret=PYCHPP_ACCESS_TOKEN_SECRET,
+                            keep_raw=False,
+                            )
+    team = lightweight_chpp.team(ht_id=591993)
+    assert team._data is None
+    assert team.name == "thekiki's"
+    for p in team.players:
+        assert p._data is None
+
+    raw_team = lightweight_chpp.team(ht_id=591993, keep_raw=True)
+    assert raw_team is not team
+    assert raw_team._data is not None
+
+
+def test_intern_strings():
+    interning_chpp = CHPP(consumer_key=PYCHPP_CONSUMER_KEY,
+                          consumer_secret=PYCHPP_CONSUMER_SECRET,
+                          access_token_key=PYCHPP_ACCESS_TOKEN_KEY,
+                          access_token_secret=PYCHPP_ACCESS_TOKEN_SECRET,
+                          intern_strings=True,
+                          )
+
+    first_league = interning_chpp.league(ht_id=36378)
+    second_league = interning_chpp.league(ht_id=36378)
+    for first_rank, second_rank in zip(first_league.ranks, second_league.ranks):
+        assert first_rank.team_name is second_rank.team_name
+
+    assert len(interning_chpp.string_table) > 0
+
+
+def test_pickle_models(chpp):
+    import pickle
+
+    team = chpp.team(ht_id=591993, prefetch=["arena"])
+    unpickled_team = pickle.loads(pickle.dumps(team))
+
+    assert unpickled_team.ht_id == team.ht_id
+    assert unpickled_team.name == team.name
+    assert unpickled_team.arena.name == team.arena.name
+    assert unpickled_team._data is None
+    assert unpickled_team._chpp.credentials == chpp.credentials
+    assert isinstance(unpickled_team.user, HTUser)
+
+    unpickled_match = pickle.loads(pickle.dumps(chpp.match(ht_id=547513790, events=True)))
+    assert unpickled_match._chpp is unpickled_team._chpp
+    assert chpp.credentials.connect() is unpickled_team._chpp
+
+
+def test_pickle_settings():
+    import pickle
+    from pychpp import ht_credentials
+    from pychpp.ht_circuit_breaker import HTCircuitBreaker
+
+    configured_chpp = CHPP(consumer_key=PYCHPP_CONSUMER_KEY,
+                           consumer_secret=PYCHPP_CONSUMER_SECRET,
+                           access_token_key=PYCHPP_ACCESS_TOKEN_KEY,
+                           access_token_secret=PYCHPP_ACCESS_TOKEN_SECRET,
+                           keep_raw=False,
+                           identity_map_ttl=60,
+                           )
+    configured_chpp.circuit_breaker = HTCircuitBreaker(failure_threshold=2, stale_max_size=8)
+
+    # Pickling doesn't register the instance, but keeps its settings
+    unpickled_chpp = pickle.loads(pickle.dumps(configured_chpp))
+    assert unpickled_chpp is not configured_chpp
+    assert unpickled_chpp._settings() == configured_chpp._settings()
+    assert unpickled_chpp.identity_map.ttl == 60
+    assert unpickled_chpp.circuit_breaker.stale_max_size == 8
+    assert pickle.loads(pickle.dumps(configured_chpp)) is unpickled_chpp
+
+    ht_credentials._register(configured_chpp)
+    assert pickle.loads(pickle.dumps(configured_chpp)) is configured_chpp
+
+
+def test_parsing_pool(chpp):
+    from pychpp.ht_circuit_breaker import HTCircuitBreaker
+
+    match_ids = [547513790, 547513791]
+    matches = list(chpp.parsing_pool(processes=2).matches(match_ids, events=True))
+
+    assert sorted(m.ht_id for m in matches) == match_ids
+    for m in matches:
+        assert isinstance(m, HTMatch)
+        assert m._chpp is chpp
+        assert m._data is None
+        assert m.home_team_name == chpp.match(ht_id=m.ht_id).home_team_name
+
+    # Strings of models built by workers are interned in the string table of chpp
+    interning_chpp = CHPP(consumer_key=PYCHPP_CONSUMER_KEY,
+                          consumer_secret=PYCHPP_CONSUMER_SECRET,
+                          access_token_key=PYCHPP_ACCESS_TOKEN_KEY,
+                          access_token_secret=PYCHPP_ACCESS_TOKEN_SECRET,
+                          intern_strings=True,
+                          )
+    first_match, second_match = interning_chpp.parsing_pool(processes=2).matches(match_ids[:1] * 2)
+    assert first_match is not second_match
+    assert first_match.home_team_name is second_match.home_team_name
+    assert first_match.events[0]["description"] is second_match.events[0]["description"]
+
+    # Fetches go through the negative cache and the circuit breaker of chpp
+    pool = chpp.parsing_pool(processes=2)
+    with pytest.raises(HTUnknownMatchIdError):
+        list(pool.matches([999999999]))
+    assert len(chpp.negative_cache) == 1
+
+    def unavailable_request_raw(**kwargs):
+        raise ConnectionError("Hattrick is unavailable")
+
+    chpp.circuit_breaker = HTCircuitBreaker(failure_threshold=1)
+    chpp.request_raw = unavailable_request_raw
+    with pytest.raises(ConnectionError):
+        list(pool.matches(match_ids[:1]))
+    with pytest.raises(HTCircuitOpenError):
+        list(pool.matches(match_ids))
+
+
+def test_token_pool():
+    pool = HTTokenPool(consumer_key=PYCHPP_CONSUMER_KEY,
+                       consumer_secret=PYCHPP_CONSUMER_SECRET,
+                       access_tokens=[{"key": PYCHPP_ACCESS_TOKEN_KEY, "secret": PYCHPP_ACCESS_TOKEN_SECRET}],
+                       rate=5,
+                       )
+
+    team = pool.team()
+    assert isinstance(team, HTTeam)
+    assert all(pool.owner(t) is pool.members[0] for t in pool.user()._teams_ht_id)
+    assert pool.owner(999999999) is None
+
+    assert pool.team(ht_id=591993).name == "thekiki's"
+    assert pool.load() == [0]
+
+
+def test_token_pool_owners():
+    owned = [[1, 3], [2]]
+    calls = list()
+
+    def member_request_raw(index):
+        def request_raw(**kwargs):
+            calls.append((index, kwargs["file"]))
+            if kwargs["file"] == "managercompendium":
+                teams = "".join(f"<Team><TeamId>{t}</TeamId><YouthTeam><YouthTeamId>{t + 1}</YouthTeamId></YouthTeam>"
+                                f"</Team>" for t in owned[index])
+                return (f"<HattrickData><FileName>managercompendium.xml</FileName>"
+                        f"<Manager><Teams>{teams}</Teams></Manager></HattrickData>")
+            elif kwargs["file"] == "challenges" and int(kwargs["teamId"]) not in owned[index]:
+                return "<HattrickData><FileName>chpperror.xml</FileName><ErrorCode>59</ErrorCode></HattrickData>"
+            return f"<HattrickData><FileName>{kwargs['file']}.xml</FileName></HattrickData>"
+        return request_raw
+
+    pool = HTTokenPool(consumer_key="key", consumer_secret="secret",
+                       access_tokens=[("key0", "secret0"), ("key1", "secret1")],
+                       rate=100)
+    acquired = list()
+    for index, member in enumerate(pool.members):
+        member.request_raw = member_request_raw(index)
+        pool._rate_limiters[index].acquire = lambda index=index: acquired.append(index)
+
+    # Compendiums are requested within the rate limit of each access token
+    assert pool.owner(3) is pool.members[0]
+    assert sorted(calls) == [(0, "managercompendium"), (1, "managercompendium")]
+    assert sorted(acquired) == [0, 1]
+
+    # Team and youth team IDs are distinct
+    assert pool.owner(2) is pool.members[1]
+    assert pool.owner(2, youth=True) is pool.members[0]
+
+    # Only requests which must be sent by the owner are routed to them
+    calls.clear()
+    pool._in_flight[0] += 1
+    pool.request(file="challenges", version="1.6", actionType="view", teamId=3)
+    pool.request(file="teamdetails", version="3.4", teamID=3)
+    pool.request(file="worlddetails", version="1.8")
+    pool._in_flight[0] -= 1
+    assert calls == [(0, "challenges"), (1, "teamdetails"), (1, "worlddetails")]
+
+    # Owners are reloaded when a team changed hands, and the request is sent again
+    owned[:] = [[1], [2, 3]]
+    calls.clear()
+    pool.request(file="challenges", version="1.6", actionType="view", teamId=3)
+    assert calls[0] == (0, "challenges")
+    assert calls[-1] == (1, "challenges")
+    assert pool.owner(3) is pool.members[1]
+
+    owned[:] = [[1, 3], [2]]
+    pool.refresh_owners()
+    assert pool.owner(3) is pool.members[0]
+    assert pool.load() == [0, 0]
+
+    with pytest.raises(ValueError):
+        HTTokenPool(consumer_key="key", consumer_secret="secret", access_tokens=[("key", "secret")], owners_ttl=0)
+
+
+def test_refresh_scheduler(chpp):
+    import time
+
+    updates = list()
+    scheduler = chpp.refresh_scheduler(rate=2, on_update=lambda key, value: updates.append(key))
+    team_key = scheduler.track_team(591993, max_age=datetime.timedelta(minutes=5))
+    assert scheduler.track_team(591993, max_age=60, priority=1) == team_key
+    league_key = scheduler.track_league(36378, max_age=300)
+    assert scheduler.get(team_key) is None
+
+    with scheduler:
+        deadline = time.monotonic() + 30
+        while len(updates) < 2 and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+    assert sorted(updates) == sorted([team_key, league_key])
+    assert scheduler.get(team_key).name == "thekiki's"
+    assert isinstance(scheduler.get(league_key), HTLeague)
+    assert scheduler.age(team_key) < 60
+
+
+def test_live_match_tracker(chpp):
+    received = list()
+    tracker = chpp.live_match_tracker(play_interval=1)
+    tracker.subscribe(lambda ht_id, events, state: received.append((ht_id, events, state)))
+    tracker.follow(547513790)
+    assert tracker.following() == [547513790]
+
+    with tracker:
+        assert tracker.join(timeout=30)
+
+    match = chpp.match(ht_id=547513790, events=True)
+
+    # A finished match is polled once, and all its events are sent at once
+    assert len(received) == 1
+    ht_id, events, state = received[0]
+    assert ht_id == 547513790
+    assert events == match.events
+    assert state["finished"] is True
+    assert state["events"] == len(match.events)
+    assert tracker.following() == []
+
+    with pytest.raises(ValueError):
+        chpp.live_match_tracker(play_interval=0)
+
+
+def test_live_match_tracker_schedule(chpp):
+    import time
+
+    # Match dates are compared with the fetched date given by Hattrick,
+    # whatever the local date and timezone are
+    chpp.request_raw = lambda **kwargs: (
+        "<HattrickData><FileName>matchdetails.xml</FileName><FetchedDate>2020-01-01 14:00:00</FetchedDate>"
+        "<Match><MatchID>547513790</MatchID><MatchDate>2020-01-01 15:00:00</MatchDate></Match></HattrickData>")
+    tracker = chpp.live_match_tracker(play_interval=1, idle_interval=600, kickoff_lead=120)
+    tracker.follow(547513790)
+
+    with tracker:
+        deadline = time.monotonic() + 10
+        while tracker.state(547513790) is None and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+    assert tracker.state(547513790)["finished"] is False
+    assert tracker._matches[547513790].due - time.monotonic() > 500
+
+
+def test_max_workers(chpp):
+    from pychpp import ht_concurrency
+
+    assert ht_concurrency.bounded_map(lambda i: i * 2, range(3), max_workers=2) == [0, 2, 4]
+    for max_workers in (0, -1, 1.5):
+        with pytest.raises(ValueError):
+            ht_concurrency.bounded_map(lambda i: i, range(3), max_workers=max_workers)
+        with pytest.raises(ValueError):
+            list(ht_concurrency.bounded_imap(lambda i: i, range(3), max_workers=max_workers))
+        with pytest.raises(ValueError):
+            chpp.live_match_tracker(max_workers=max_workers)
+
+
+def test_request_coalescing(chpp):
+    import threading
+    import time
+    from pychpp import ht_concurrency
+
+    calls = list()
+    request_raw = chpp.request_raw
+    barrier = threading.Barrier(4)
+
+    def slow_request_raw(**kwargs):
+        # Response is slow enough for other requests to join this one
+        calls.append(kwargs)
+        time.sleep(0.5)
+        if kwargs["file"] == "missing":
+            raise ValueError("missing file")
+        elif kwargs["file"] == "challenges":
+            return "<HattrickData><FileName>challenges.xml</FileName></HattrickData>"
+        return request_raw(**kwargs)
+
+    chpp.request_raw = slow_request_raw
+
+    def concurrent_requests(**kwargs):
+        def send(_):
+            barrier.wait()
+            try:
+                return chpp.request(**kwargs)
+            except ValueError as e:
+                return e
+
+        return ht_concurrency.bounded_map(send, range(4), max_workers=4)
+
+    # Concurrent identical requests share one request and one parsed tree
+    responses = concurrent_requests(file="teamdetails", version="3.4", teamID=591993)
+    assert len(calls) == 1
+    assert all(r is responses[0] for r in responses)
+    assert responses[0].find("Teams/Team/TeamID").text == "591993"
+
+    # Each request sharing a failed one raises its own exception
+    del calls[:]
+    errors = concurrent_requests(file="missing")
+    assert len(calls) == 1
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert len(set(map(id, errors))) == 4
+    original = next(e for e in errors if e.__cause__ is None)
+    assert all(e.__cause__ is original for e in errors if e is not original)
+
+    # Actions are never coalesced
+    del calls[:]
+    concurrent_requests(file="challenges", version="1.6", actionType="challenge",
+                        teamId=591993, opponentTeamId=1)
+    assert len(calls) == 4
+
+
+def test_negative_cache(chpp):
+    calls = list()
+    request_raw = chpp.request_raw
+
+    def counted_request_raw(**kwargs):
+        calls.append(kwargs)
+        return request_raw(**kwargs)
+
+    chpp.request_raw = counted_request_raw
+
+    for _ in range(2):
+        with pytest.raises(HTUnknownTeamIdError):
+            chpp.request(file="teamdetails", version="3.4", teamID=999999999)
+
+    # Second error is raised from the negative cache
+    assert len(calls) == 1
+    assert len(chpp.negative_cache) == 1
+
+    with pytest.raises(HTUnknownTeamIdError):
+        chpp.request(file="teamdetails", version="3.4", teamID=999999999, use_negative_cache=False)
+    assert len(calls) == 2
+
+    chpp.negative_cache.clear()
+    with pytest.raises(HTUnknownTeamIdError):
+        chpp.team(ht_id=999999999)
+    assert len(calls) == 3
+
+    # Models can bypass the negative cache too
+    with pytest.raises(HTUnknownTeamIdError):
+        chpp.team(ht_id=999999999, use_negative_cache=False)
+    assert len(calls) == 4
+
+    # An ID unknown in a source system is not unknown in others
+    def youth_unknown_request_raw(**kwargs):
+        if kwargs.get("sourceSystem") == "youth":
+            calls.append(kwargs)
+            return "<HattrickData><FileName>chpperror.xml</FileName><ErrorCode>51</ErrorCode></HattrickData>"
+        return counted_request_raw(**kwargs)
+
+    chpp.request_raw = youth_unknown_request_raw
+    with pytest.raises(HTUnknownMatchIdError):
+        chpp.match(ht_id=547513790, source="youth")
+    assert chpp.match(ht_id=547513790).ht_id == 547513790
+    assert len(calls) == 6
+
+
+def test_circuit_breaker(chpp):
+    import time
+    from pychpp.ht_circuit_breaker import HTCircuitBreaker
+
+    chpp.circuit_breaker = HTCircuitBreaker(failure_threshold=2, recovery_timeout=0.5, stale_max_size=8)
+    team_data = chpp.request(file="teamdetails", version="3.4", teamID=591993)
+
+    request_raw = chpp.request_raw
+
+    # Write actions are stubbed, so that no challenge is really declined
+    chpp.request_raw = lambda **kwargs: "<HattrickData><FileName>challenges.xml</FileName></HattrickData>"
+    challenge_manager = chpp.challenge_manager(team_ht_id=591993)
+    challenge_manager.decline(training_match_ht_id=42)
+
+    def unavailable_request_raw(**kwargs):
+        raise ConnectionError("Hattrick is unavailable")
+
+    chpp.request_raw = unavailable_request_raw
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            chpp.request(file="teamdetails", version="3.4", teamID=44307)
+    assert chpp.circuit_breaker.state == HTCircuitBreaker.OPEN
+
+    # Open circuit fails fast, or serves the last response
+    with pytest.raises(HTCircuitOpenError):
+        chpp.request(file="teamdetails", version="3.4", teamID=44307)
+    assert chpp.request(file="teamdetails", version="3.4", teamID=591993) is team_data
+
+    # Write actions are never served stale
+    with pytest.raises(HTCircuitOpenError):
+        challenge_manager.decline(training_match_ht_id=42)
+
+    time.sleep(0.5)
+    assert chpp.circuit_breaker.state == HTCircuitBreaker.HALF_OPEN
+
+    chpp.request_raw = request_raw
+    assert chpp.request(file="teamdetails", version="3.4", teamID=44307).find("Teams/Team/TeamID").text == "44307"
+    assert chpp.circuit_breaker.state == HTCircuitBreaker.CLOSED
+
+    # Pages which are not CHPP documents, such as maintenance pages, are failures
+    chpp.request_raw = lambda **kwargs: "<html><body>Maintenance</body></html>"
+    for _ in range(2):
+        with pytest.raises(HTUndefinedError):
+            chpp.request(file="teamdetails", version="3.4", teamID=44307)
+    assert chpp.circuit_breaker.state == HTCircuitBreaker.OPEN
+
+
+def test_circuit_breaker_probe():
+    import threading
+    import time
+    from pychpp.ht_circuit_breaker import HTCircuitBreaker
+
+    breaker = HTCircuitBreaker(failure_threshold=2, recovery_timeout=0.1)
+    slow_request_sent = threading.Event()
+    slow_request_done = threading.Event()
+    probe_done = threading.Event()
+
+    def slow_failing_request():
+        slow_request_sent.set()
+        slow_request_done.wait()
+        raise ConnectionError("Hattrick is unavailable")
+
+    def failing_request():
+        raise ConnectionError("Hattrick is unavailable")
+
+    slow_thread = threading.Thread(target=lambda: pytest.raises(ConnectionError, breaker.call, "slow",
+                                                                slow_failing_request))
+    slow_thread.start()
+    slow_request_sent.wait()
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call("request", failing_request)
+    assert breaker.state == HTCircuitBreaker.OPEN
+
+    time.sleep(0.1)
+    probe_thread = threading.Thread(target=breaker.call, args=("probe", probe_done.wait))
+    probe_thread.start()
+
+    # A request sent before the circuit was opened doesn't release the probe
+    slow_request_done.set()
+    slow_thread.join()
+    with pytest.raises(HTCircuitOpenError):
+        breaker.call("request", lambda: None)
+    assert breaker.state == HTCircuitBreaker.HALF_OPEN
+
+    probe_done.set()
+    probe_thread.join()
+    assert breaker.state == HTCircuitBreaker.CLOSED